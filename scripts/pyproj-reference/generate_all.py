@@ -13,15 +13,52 @@ Usage:
 """
 
 import argparse
+import contextlib
+import importlib
+import io
+import multiprocessing
 import os
 import sys
+import traceback
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
-# Import generator modules
-from generate_transform_reference import generate_transform_reference
-from generate_parsing_reference import generate_parsing_reference
-from generate_format_reference import generate_format_reference
-from generate_grid_reference import generate_grid_reference
+
+class GeneratorError(Exception):
+    """A generator failed in its worker, with what it printed and its traceback.
+
+    Everything is passed to Exception.__init__ so the error pickles back to
+    the parent process intact.
+    """
+
+    def __init__(self, message: str, output: str, worker_traceback: str):
+        super().__init__(message, output, worker_traceback)
+        self.message = message
+        self.output = output
+        self.worker_traceback = worker_traceback
+
+    def __str__(self) -> str:
+        return self.message
+
+
+def _run_generator(module_name: str, output_file: str, verbose: bool, **options) -> str:
+    """Run one generator in a worker process and return everything it printed.
+
+    Each generator module exposes a function of the same name, which is called
+    with any extra keyword options. It is imported here rather than at the top
+    of this script so that pyproj/PROJ is only initialized inside the workers.
+    If the generator raises, a GeneratorError carries its output so far.
+    """
+    generator_func = getattr(importlib.import_module(module_name), module_name)
+    buffer = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(buffer):
+            generator_func(output_file, verbose=verbose, **options)
+    except Exception as e:
+        raise GeneratorError(
+            str(e), buffer.getvalue(), traceback.format_exc()
+        ) from None
+    return buffer.getvalue()
 
 
 def main():
@@ -40,6 +77,11 @@ def main():
         action="store_true",
         help="Enable verbose output"
     )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Regenerate the format exports instead of reusing the on-disk export cache"
+    )
     
     args = parser.parse_args()
     
@@ -55,24 +97,56 @@ def main():
     
     # Generate each reference file
     generators = [
-        ("transform_reference.json", generate_transform_reference),
-        ("parsing_reference.json", generate_parsing_reference),
-        ("format_export_reference.json", generate_format_reference),
-        ("grid_transform_reference.json", generate_grid_reference),
+        ("transform_reference.json", "generate_transform_reference", {}),
+        ("parsing_reference.json", "generate_parsing_reference", {}),
+        (
+            "format_export_reference.json",
+            "generate_format_reference",
+            {"use_cache": not args.no_cache},
+        ),
+        ("grid_transform_reference.json", "generate_grid_reference", {}),
     ]
     
-    for filename, generator_func in generators:
-        output_file = output_dir / filename
-        print(f"Generating {filename}...")
-        try:
-            generator_func(str(output_file), verbose=args.verbose)
-            print(f"  -> {output_file}")
-        except Exception as e:
-            print(f"  ERROR: {e}", file=sys.stderr)
-            if args.verbose:
-                import traceback
-                traceback.print_exc()
-            sys.exit(1)
+    # The generators share no state and each writes its own file, so run them
+    # in parallel. Results are reported in submission order to keep the log stable.
+    with ProcessPoolExecutor(max_workers=min(4, len(generators))) as executor:
+        futures = [
+            (
+                filename,
+                output_dir / filename,
+                executor.submit(
+                    _run_generator,
+                    module_name,
+                    str(output_dir / filename),
+                    args.verbose,
+                    **options,
+                ),
+            )
+            for filename, module_name, options in generators
+        ]
+        
+        for filename, output_file, future in futures:
+            print(f"Generating {filename}...")
+            try:
+                print(future.result(), end="")
+                print(f"  -> {output_file}")
+            except Exception as e:
+                if isinstance(e, GeneratorError):
+                    print(e.output, end="")
+                sys.stdout.flush()
+                print(f"  ERROR: {e}", file=sys.stderr)
+                if args.verbose:
+                    # Show where the generator failed, not where it was re-raised
+                    if isinstance(e, GeneratorError):
+                        print(e.worker_traceback, end="", file=sys.stderr)
+                    else:
+                        traceback.print_exc()
+                # Do not wait for the other generators: stop the workers still
+                # running, then cancel those not yet started and reap the pool
+                for process in multiprocessing.active_children():
+                    process.terminate()
+                executor.shutdown(wait=True, cancel_futures=True)
+                sys.exit(1)
     
     print()
     print("=" * 60)
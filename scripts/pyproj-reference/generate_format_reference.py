@@ -9,162 +9,300 @@ This script generates test cases for CRS export to various formats:
 - PROJJSON
 """
 
+import hashlib
 import json
-from typing import Dict, List, Any
-from pyproj import CRS
+import os
+import sys
+import warnings
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Any, Optional, Tuple
 
+from reference_json import write_json_stream
 
-def get_test_crs_definitions() -> List[Dict[str, Any]]:
+if TYPE_CHECKING:
+    from pyproj import CRS
+
+# to_proj4() warns on every export that PROJ strings can lose information;
+# the reference data records them knowingly, so skip the warning machinery
+warnings.filterwarnings(
+    "ignore",
+    message="You will likely lose important projection information",
+    category=UserWarning,
+    module=r"pyproj\.crs",
+)
+
+# A CRS definition to export: input string, test case name and description
+CrsDef = namedtuple("CrsDef", "input name desc")
+
+
+def _export_cache_path() -> Path:
+    """Location of the on-disk cache of CRS exports."""
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return Path(cache_home) / "proj4sedona" / "format_exports.json"
+
+
+def _load_export_cache(versions: Dict[str, str]) -> Dict[str, Dict[str, Any]]:
+    """Load cached exports, discarding them if written with other versions or data."""
+    try:
+        with open(_export_cache_path()) as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if cache.get("versions") != versions:
+        return {}
+    return cache.get("exports", {})
+
+
+def _save_export_cache(versions: Dict[str, str], exports: Dict[str, Dict[str, Any]]) -> None:
+    """Persist the export cache; failures only cost a slower next run."""
+    path = _export_cache_path()
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump({"versions": versions, "exports": exports}, f)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+
+
+@lru_cache(maxsize=256)
+def _crs_from_str(value: str) -> "CRS":
+    """Parse a CRS from an EPSG code, WKT or PROJ string, memoized per process."""
+    from pyproj import CRS
+
+    return CRS(value)
+
+
+@lru_cache(maxsize=256)
+def _crs_from_json(frozen: str) -> "CRS":
+    """Parse a CRS from a canonical (sorted-key) PROJJSON string, memoized per process."""
+    from pyproj import CRS
+
+    return CRS.from_json_dict(json.loads(frozen))
+
+
+@lru_cache(maxsize=512)
+def _crs_meta(source: str, projjson: bool = False) -> Tuple[str, Optional[float]]:
+    """Return (type name, ellipsoid semi-major axis in metres) for a CRS source, memoized."""
+    crs = _crs_from_json(source) if projjson else _crs_from_str(source)
+    ellipsoid = crs.ellipsoid
+    return crs.type_name, ellipsoid.semi_major_metre if ellipsoid else None
+
+
+@lru_cache(maxsize=512)
+def _verify_round_trip(
+    fmt_name: str, exported: str, crs_type: str, crs_a: Optional[float]
+) -> Dict[str, Any]:
+    """Re-parse an exported CRS and compare it with the source CRS properties.
+
+    Results are memoized on the export string and the source properties, so an
+    export that was already verified (e.g. a PROJ string shared by several
+    inputs) is not parsed again. PROJJSON exports must be passed as canonical
+    sorted-key JSON strings.
+    """
+    try:
+        roundtrip_type, roundtrip_a = _crs_meta(exported, projjson=fmt_name == "projjson")
+        
+        # Check if round-trip preserves key properties
+        return {
+            "success": True,
+            "preserves_type": crs_type == roundtrip_type,
+            "preserves_ellipsoid_a": abs(crs_a - roundtrip_a) < 0.01
+            if crs_a is not None and roundtrip_a is not None else None,
+            "error": None
+        }
+    except Exception as e:
+        return {
+            "success": False,
+            "error": str(e)
+        }
+
+
+_TEST_CRS_DEFINITIONS = (
+    # Geographic CRS
+    CrsDef(
+        sys.intern("EPSG:4326"),
+        "wgs84_geographic",
+        "WGS84 Geographic"
+    ),
+    CrsDef(
+        sys.intern("EPSG:4269"),
+        "nad83_geographic",
+        "NAD83 Geographic"
+    ),
+    # Projected CRS - Mercator
+    CrsDef(
+        sys.intern("EPSG:3857"),
+        "web_mercator",
+        "Web Mercator"
+    ),
+    # UTM Zones
+    CrsDef(
+        sys.intern("EPSG:32610"),
+        "utm_10n",
+        "UTM Zone 10N"
+    ),
+    CrsDef(
+        sys.intern("EPSG:32632"),
+        "utm_32n",
+        "UTM Zone 32N"
+    ),
+    CrsDef(
+        sys.intern("EPSG:32733"),
+        "utm_33s",
+        "UTM Zone 33S"
+    ),
+    # Lambert Conformal Conic (from PROJ string)
+    CrsDef(
+        sys.intern("+proj=lcc +lat_1=33 +lat_2=45 +lat_0=39 +lon_0=-96 +x_0=0 +y_0=0 +datum=WGS84 +units=m +no_defs"),
+        "lcc_us",
+        "Lambert Conformal Conic (US)"
+    ),
+    # Transverse Mercator
+    CrsDef(
+        sys.intern("+proj=tmerc +lat_0=0 +lon_0=9 +k=0.9996 +x_0=500000 +y_0=0 +datum=WGS84 +units=m +no_defs"),
+        "tmerc_custom",
+        "Transverse Mercator"
+    ),
+    # Stereographic
+    CrsDef(
+        sys.intern("EPSG:5041"),
+        "ups_north",
+        "UPS North (Polar Stereographic)"
+    ),
+    # Albers Equal Area
+    CrsDef(
+        sys.intern("+proj=aea +lat_1=29.5 +lat_2=45.5 +lat_0=23 +lon_0=-96 +x_0=0 +y_0=0 +datum=NAD83 +units=m +no_defs"),
+        "aea_conus",
+        "Albers Equal Area (CONUS)"
+    ),
+    # Equidistant Conic
+    CrsDef(
+        sys.intern("+proj=eqdc +lat_0=40 +lon_0=-96 +lat_1=20 +lat_2=60 +x_0=0 +y_0=0 +datum=WGS84 +units=m +no_defs"),
+        "eqdc_custom",
+        "Equidistant Conic"
+    ),
+)
+
+
+def get_test_crs_definitions() -> Tuple[CrsDef, ...]:
     """Define CRS definitions to test format exports."""
-    return [
-        # Geographic CRS
-        {
-            "input": "EPSG:4326",
-            "name": "wgs84_geographic",
-            "desc": "WGS84 Geographic"
-        },
-        {
-            "input": "EPSG:4269",
-            "name": "nad83_geographic",
-            "desc": "NAD83 Geographic"
-        },
-        # Projected CRS - Mercator
-        {
-            "input": "EPSG:3857",
-            "name": "web_mercator",
-            "desc": "Web Mercator"
-        },
-        # UTM Zones
-        {
-            "input": "EPSG:32610",
-            "name": "utm_10n",
-            "desc": "UTM Zone 10N"
-        },
-        {
-            "input": "EPSG:32632",
-            "name": "utm_32n",
-            "desc": "UTM Zone 32N"
-        },
-        {
-            "input": "EPSG:32733",
-            "name": "utm_33s",
-            "desc": "UTM Zone 33S"
-        },
-        # Lambert Conformal Conic (from PROJ string)
-        {
-            "input": "+proj=lcc +lat_1=33 +lat_2=45 +lat_0=39 +lon_0=-96 +x_0=0 +y_0=0 +datum=WGS84 +units=m +no_defs",
-            "name": "lcc_us",
-            "desc": "Lambert Conformal Conic (US)"
-        },
-        # Transverse Mercator
-        {
-            "input": "+proj=tmerc +lat_0=0 +lon_0=9 +k=0.9996 +x_0=500000 +y_0=0 +datum=WGS84 +units=m +no_defs",
-            "name": "tmerc_custom",
-            "desc": "Transverse Mercator"
-        },
-        # Stereographic
-        {
-            "input": "EPSG:5041",
-            "name": "ups_north",
-            "desc": "UPS North (Polar Stereographic)"
-        },
-        # Albers Equal Area
-        {
-            "input": "+proj=aea +lat_1=29.5 +lat_2=45.5 +lat_0=23 +lon_0=-96 +x_0=0 +y_0=0 +datum=NAD83 +units=m +no_defs",
-            "name": "aea_conus",
-            "desc": "Albers Equal Area (CONUS)"
-        },
-        # Equidistant Conic
-        {
-            "input": "+proj=eqdc +lat_0=40 +lon_0=-96 +lat_1=20 +lat_2=60 +x_0=0 +y_0=0 +datum=WGS84 +units=m +no_defs",
-            "name": "eqdc_custom",
-            "desc": "Equidistant Conic"
-        },
-    ]
-
-
-def generate_format_reference(output_file: str, verbose: bool = False) -> None:
-    """Generate format export reference data."""
+    return _TEST_CRS_DEFINITIONS
+
+
+def process_crs_definition(
+    crs_def: CrsDef,
+    verbose: bool = False,
+    export_cache: Optional[Dict[str, Dict[str, Any]]] = None,
+) -> Dict[str, Any]:
+    """Export one CRS definition to every format and verify each round-trip.
+
+    When export_cache is given, exports are looked up in (and added to) it,
+    keyed by a digest of the input string.
+    """
+    if verbose:
+        print(f"  Processing: {crs_def.name}")
     
-    reference_data = {
-        "version": "1.0",
-        "generator": "pyproj",
-        "pyproj_version": None,
-        "test_cases": []
-    }
+    try:
+        crs_type, crs_a = _crs_meta(crs_def.input)
+        
+        # Export to all formats, unless a previous run already did
+        digest = hashlib.blake2b(crs_def.input.encode()).hexdigest()
+        exports = export_cache.get(digest) if export_cache is not None else None
+        if exports is None:
+            crs = _crs_from_str(crs_def.input)
+            exports = {
+                "wkt1": crs.to_wkt(version="WKT1_GDAL"),
+                "wkt2": crs.to_wkt(version="WKT2_2019"),
+                "proj_string": crs.to_proj4(),
+                "projjson": crs.to_json_dict(),
+            }
+            if export_cache is not None:
+                export_cache[digest] = exports
+        
+        test_case = {
+            "name": crs_def.name,
+            "description": crs_def.desc,
+            "input": crs_def.input,
+            "exports": exports,
+            "round_trip_verification": {},
+            "error": None
+        }
+        
+        # Verify round-trip for each format
+        for fmt_name, fmt_value in test_case["exports"].items():
+            if fmt_value is None:
+                test_case["round_trip_verification"][fmt_name] = {
+                    "success": False,
+                    "error": "Export returned None"
+                }
+                continue
+            
+            if fmt_name == "projjson":
+                # Dicts are not hashable, so freeze to canonical JSON for the cache key
+                fmt_value = json.dumps(fmt_value, sort_keys=True)
+            test_case["round_trip_verification"][fmt_name] = dict(
+                _verify_round_trip(fmt_name, fmt_value, crs_type, crs_a)
+            )
+    
+    except Exception as e:
+        test_case = {
+            "name": crs_def.name,
+            "description": crs_def.desc,
+            "input": crs_def.input,
+            "exports": None,
+            "round_trip_verification": None,
+            "error": str(e)
+        }
+    
+    return test_case
+
+
+def generate_format_reference(
+    output_file: str, verbose: bool = False, use_cache: bool = True
+) -> None:
+    """Generate format export reference data.
+
+    Exports depend only on the input string, the pyproj/PROJ versions and the
+    PROJ database in use, so unless use_cache is False they are cached on disk
+    between runs and reused while all of those stay the same.
+    """
     
     # Get pyproj version
     import pyproj
-    reference_data["pyproj_version"] = pyproj.__version__
     
-    for crs_def in get_test_crs_definitions():
-        if verbose:
-            print(f"  Processing: {crs_def['name']}")
-        
-        try:
-            crs = CRS(crs_def["input"])
-            
-            # Export to all formats
-            test_case = {
-                "name": crs_def["name"],
-                "description": crs_def["desc"],
-                "input": crs_def["input"],
-                "exports": {
-                    "wkt1": crs.to_wkt(version="WKT1_GDAL"),
-                    "wkt2": crs.to_wkt(version="WKT2_2019"),
-                    "proj_string": crs.to_proj4(),
-                    "projjson": crs.to_json_dict(),
-                },
-                "round_trip_verification": {},
-                "error": None
-            }
-            
-            # Verify round-trip for each format
-            for fmt_name, fmt_value in test_case["exports"].items():
-                if fmt_value is None:
-                    test_case["round_trip_verification"][fmt_name] = {
-                        "success": False,
-                        "error": "Export returned None"
-                    }
-                    continue
-                    
-                try:
-                    if fmt_name == "projjson":
-                        # For PROJJSON, we need to convert dict to string first
-                        crs_roundtrip = CRS.from_json_dict(fmt_value)
-                    else:
-                        crs_roundtrip = CRS(fmt_value)
-                    
-                    # Check if round-trip preserves key properties
-                    test_case["round_trip_verification"][fmt_name] = {
-                        "success": True,
-                        "preserves_type": crs.type_name == crs_roundtrip.type_name,
-                        "preserves_ellipsoid_a": abs(
-                            crs.ellipsoid.semi_major_metre - crs_roundtrip.ellipsoid.semi_major_metre
-                        ) < 0.01 if crs.ellipsoid and crs_roundtrip.ellipsoid else None,
-                        "error": None
-                    }
-                except Exception as e:
-                    test_case["round_trip_verification"][fmt_name] = {
-                        "success": False,
-                        "error": str(e)
-                    }
-            
-        except Exception as e:
-            test_case = {
-                "name": crs_def["name"],
-                "description": crs_def["desc"],
-                "input": crs_def["input"],
-                "exports": None,
-                "round_trip_verification": None,
-                "error": str(e)
-            }
-        
-        reference_data["test_cases"].append(test_case)
+    versions = {
+        "pyproj": pyproj.__version__,
+        "proj": pyproj.proj_version_str,
+        "epsg": pyproj.database.get_database_metadata("EPSG.VERSION"),
+        "proj_data_dir": pyproj.datadir.get_data_dir(),
+    }
+    export_cache = _load_export_cache(versions) if use_cache else None
+    
+    header = {
+        "version": "1.0",
+        "generator": "pyproj",
+        "pyproj_version": pyproj.__version__,
+    }
+    
+    # CRS definitions are independent and pyproj releases the GIL inside PROJ,
+    # so process them on a thread pool. map() yields results in input order,
+    # and each test case is streamed to the file as soon as it is ready.
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+        test_cases = executor.map(
+            partial(process_crs_definition, verbose=verbose, export_cache=export_cache),
+            get_test_crs_definitions(),
+        )
+        write_json_stream(output_file, header, {"test_cases": test_cases})
     
-    # Write output
-    with open(output_file, 'w') as f:
-        json.dump(reference_data, f, indent=2)
+    if export_cache is not None:
+        _save_export_cache(versions, export_cache)
 
 
 if __name__ == "__main__":
@@ -172,7 +310,10 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--output", "-o", default="format_export_reference.json")
     parser.add_argument("--verbose", "-v", action="store_true")
+    parser.add_argument(
+        "--no-cache", action="store_true", help="Do not read or write the on-disk export cache"
+    )
     args = parser.parse_args()
     
-    generate_format_reference(args.output, args.verbose)
+    generate_format_reference(args.output, args.verbose, use_cache=not args.no_cache)
     print(f"Generated: {args.output}")
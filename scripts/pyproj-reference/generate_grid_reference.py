@@ -3,7 +3,8 @@
 Generate grid-based transformation reference data using pyproj.
 
 This script generates test cases for coordinate transformations that use
-grid files (like NTv2 grids) from cdn.proj.org.
+grid files (like NTv2 grids). Missing grids are downloaded from cdn.proj.org
+into PROJ's user data directory before any transform runs.
 
 Grid files tested:
 - us_noaa_conus.tif (NAD83 to NAD83(HARN) for CONUS)
@@ -11,143 +12,354 @@ Grid files tested:
 - uk_os_OSTN15_NTv2_OSGBtoETRS.tif (OSGB36 to ETRS89 for Great Britain)
 """
 
-import json
-from typing import Dict, List, Any
-from pyproj import CRS, Transformer
-from pyproj.transformer import TransformerGroup
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, List, Any, Optional, Sequence, Tuple
+import numpy as np
 import os
 
+from reference_json import write_json_stream
+
+if TYPE_CHECKING:
+    from pyproj import CRS, Transformer
+
+
+_GRID_TEST_CASES = (
+    # US CONUS grid transformation (NAD83 to NAD83(HARN))
+    {
+        "name": "conus_nad83_to_harn",
+        "from_crs": "EPSG:4269",  # NAD83
+        "to_crs": "EPSG:4152",  # NAD83(HARN)
+        "grid_file": "us_noaa_conus.tif",
+        "test_points": [
+            {"name": "denver", "lon": -104.9903, "lat": 39.7392},
+            {"name": "chicago", "lon": -87.6298, "lat": 41.8781},
+            {"name": "los_angeles", "lon": -118.2437, "lat": 34.0522},
+            {"name": "miami", "lon": -80.1918, "lat": 25.7617},
+            {"name": "seattle", "lon": -122.3321, "lat": 47.6062},
+        ],
+        "desc": "NAD83 to NAD83(HARN) using CONUS grid",
+    },
+    # Canada NTv2 grid transformation (NAD27 to NAD83)
+    # NOTE: We use explicit PROJ strings with +nadgrids to force use of the specific
+    # Canadian NTv2 grid (ca_nrc_ntv2_0.tif) rather than letting pyproj pick the "best"
+    # transformer which might use NADCON5 or other grids with different accuracy.
+    # This ensures the reference data matches what proj4sedona produces.
+    {
+        "name": "canada_nad27_to_nad83",
+        "from_crs": "+proj=longlat +ellps=clrk66 +nadgrids=@ca_nrc_ntv2_0.tif +no_defs",
+        "to_crs": "+proj=longlat +datum=NAD83 +no_defs",
+        "grid_file": "ca_nrc_ntv2_0.tif",
+        "test_points": [
+            {"name": "toronto", "lon": -79.3832, "lat": 43.6532},
+            {"name": "vancouver", "lon": -123.1207, "lat": 49.2827},
+            {"name": "montreal", "lon": -73.5673, "lat": 45.5017},
+            {"name": "calgary", "lon": -114.0719, "lat": 51.0447},
+            {"name": "ottawa", "lon": -75.6972, "lat": 45.4215},
+        ],
+        "desc": "NAD27 to NAD83 using Canadian NTv2 grid",
+    },
+    # UK OSTN15 grid transformation (ETRS89 to OSGB36)
+    {
+        "name": "uk_etrs89_to_osgb36",
+        "from_crs": "EPSG:4258",  # ETRS89
+        "to_crs": "EPSG:4277",  # OSGB36
+        "grid_file": "uk_os_OSTN15_NTv2_OSGBtoETRS.tif",
+        "test_points": [
+            {"name": "london", "lon": -0.1276, "lat": 51.5074},
+            {"name": "edinburgh", "lon": -3.1883, "lat": 55.9533},
+            {"name": "cardiff", "lon": -3.1791, "lat": 51.4816},
+            {"name": "manchester", "lon": -2.2426, "lat": 53.4808},
+            {"name": "birmingham", "lon": -1.8904, "lat": 52.4862},
+        ],
+        "desc": "ETRS89 to OSGB36 using OSTN15 grid",
+    },
+    # UK OSTN15 with explicit PROJ pipeline (ETRS89 to OSGB36)
+    # Uses hgridshift with inverse to transform from ETRS89 to OSGB36
+    {
+        "name": "proj_pipeline_ostn15",
+        "from_crs": "ETRS89_pipeline",  # Special marker for pipeline
+        "to_crs": "OSGB36_pipeline",
+        "pipeline": "+proj=pipeline +step +inv +proj=longlat +ellps=GRS80 +step +proj=hgridshift +grids=uk_os_OSTN15_NTv2_OSGBtoETRS.tif +inv +step +proj=longlat +ellps=airy",
+        "grid_file": "uk_os_OSTN15_NTv2_OSGBtoETRS.tif",
+        "test_points": [
+            {"name": "london", "lon": -0.1276, "lat": 51.5074},
+            {"name": "edinburgh", "lon": -3.1883, "lat": 55.9533},
+            {"name": "cardiff", "lon": -3.1791, "lat": 51.4816},
+            {"name": "manchester", "lon": -2.2426, "lat": 53.4808},
+            {"name": "birmingham", "lon": -1.8904, "lat": 52.4862},
+        ],
+        "desc": "ETRS89 to OSGB36 using PROJ pipeline with hgridshift",
+    },
+    # UK OSTN15 with explicit +nadgrids (Forward: ETRS89 to OSGB36)
+    # This test case uses explicit PROJ strings that proj4sedona can execute
+    # Note: We use EPSG transformer for reference values since pyproj +nadgrids doesn't work for OSTN15
+    {
+        "name": "proj_nadgrids_ostn15_forward",
+        "from_crs": "+proj=longlat +ellps=GRS80 +no_defs",  # ETRS89
+        "to_crs": "+proj=longlat +ellps=airy +nadgrids=@uk_os_OSTN15_NTv2_OSGBtoETRS.tif +no_defs",  # OSGB36 with grid
+        "grid_file": "uk_os_OSTN15_NTv2_OSGBtoETRS.tif",
+        "test_points": [
+            {"name": "london", "lon": -0.1276, "lat": 51.5074},
+            {"name": "edinburgh", "lon": -3.1883, "lat": 55.9533},
+            {"name": "cardiff", "lon": -3.1791, "lat": 51.4816},
+            {"name": "manchester", "lon": -2.2426, "lat": 53.4808},
+            {"name": "birmingham", "lon": -1.8904, "lat": 52.4862},
+        ],
+        "desc": "ETRS89 to OSGB36 using explicit +nadgrids (forward direction)",
+        "reference_transformer": (
+            "EPSG:4258",
+            "EPSG:4277",
+        ),  # Use EPSG for reference
+    },
+    # UK OSTN15 with explicit +nadgrids (Inverse: OSGB36 to ETRS89)
+    # This test case uses explicit PROJ strings that proj4sedona can execute
+    # Note: We use EPSG transformer for reference values since pyproj +nadgrids doesn't work for OSTN15
+    {
+        "name": "proj_nadgrids_ostn15_inverse",
+        "from_crs": "+proj=longlat +ellps=airy +nadgrids=@uk_os_OSTN15_NTv2_OSGBtoETRS.tif +no_defs",  # OSGB36 with grid
+        "to_crs": "+proj=longlat +ellps=GRS80 +no_defs",  # ETRS89
+        "grid_file": "uk_os_OSTN15_NTv2_OSGBtoETRS.tif",
+        "test_points": [
+            # Use OSGB36 coordinates (from EPSG:4258->EPSG:4277 forward transform)
+            {
+                "name": "london",
+                "lon": -0.12601865501757062,
+                "lat": 51.506888185279635,
+            },
+            {
+                "name": "edinburgh",
+                "lon": -3.1868736941194284,
+                "lat": 55.95336278929409,
+            },
+            {"name": "cardiff", "lon": -3.177835328022739, "lat": 51.4811301825721},
+            {
+                "name": "manchester",
+                "lon": -2.2411629558334205,
+                "lat": 53.48053580324155,
+            },
+            {
+                "name": "birmingham",
+                "lon": -1.8889628322226104,
+                "lat": 52.48581568047493,
+            },
+        ],
+        "desc": "OSGB36 to ETRS89 using explicit +nadgrids (inverse direction)",
+        "reference_transformer": (
+            "EPSG:4277",
+            "EPSG:4258",
+        ),  # Use EPSG for reference
+    },
+)
+
 
-def get_grid_test_cases() -> List[Dict[str, Any]]:
+def get_grid_test_cases() -> Tuple[Dict[str, Any], ...]:
     """Define grid-based transformation test cases."""
-    return [
-        # US CONUS grid transformation (NAD83 to NAD83(HARN))
-        {
-            "name": "conus_nad83_to_harn",
-            "from_crs": "EPSG:4269",  # NAD83
-            "to_crs": "EPSG:4152",  # NAD83(HARN)
-            "grid_file": "us_noaa_conus.tif",
-            "test_points": [
-                {"name": "denver", "lon": -104.9903, "lat": 39.7392},
-                {"name": "chicago", "lon": -87.6298, "lat": 41.8781},
-                {"name": "los_angeles", "lon": -118.2437, "lat": 34.0522},
-                {"name": "miami", "lon": -80.1918, "lat": 25.7617},
-                {"name": "seattle", "lon": -122.3321, "lat": 47.6062},
-            ],
-            "desc": "NAD83 to NAD83(HARN) using CONUS grid",
-        },
-        # Canada NTv2 grid transformation (NAD27 to NAD83)
-        # NOTE: We use explicit PROJ strings with +nadgrids to force use of the specific
-        # Canadian NTv2 grid (ca_nrc_ntv2_0.tif) rather than letting pyproj pick the "best"
-        # transformer which might use NADCON5 or other grids with different accuracy.
-        # This ensures the reference data matches what proj4sedona produces.
-        {
-            "name": "canada_nad27_to_nad83",
-            "from_crs": "+proj=longlat +ellps=clrk66 +nadgrids=@ca_nrc_ntv2_0.tif +no_defs",
-            "to_crs": "+proj=longlat +datum=NAD83 +no_defs",
-            "grid_file": "ca_nrc_ntv2_0.tif",
-            "test_points": [
-                {"name": "toronto", "lon": -79.3832, "lat": 43.6532},
-                {"name": "vancouver", "lon": -123.1207, "lat": 49.2827},
-                {"name": "montreal", "lon": -73.5673, "lat": 45.5017},
-                {"name": "calgary", "lon": -114.0719, "lat": 51.0447},
-                {"name": "ottawa", "lon": -75.6972, "lat": 45.4215},
-            ],
-            "desc": "NAD27 to NAD83 using Canadian NTv2 grid",
-        },
-        # UK OSTN15 grid transformation (ETRS89 to OSGB36)
-        {
-            "name": "uk_etrs89_to_osgb36",
-            "from_crs": "EPSG:4258",  # ETRS89
-            "to_crs": "EPSG:4277",  # OSGB36
-            "grid_file": "uk_os_OSTN15_NTv2_OSGBtoETRS.tif",
-            "test_points": [
-                {"name": "london", "lon": -0.1276, "lat": 51.5074},
-                {"name": "edinburgh", "lon": -3.1883, "lat": 55.9533},
-                {"name": "cardiff", "lon": -3.1791, "lat": 51.4816},
-                {"name": "manchester", "lon": -2.2426, "lat": 53.4808},
-                {"name": "birmingham", "lon": -1.8904, "lat": 52.4862},
-            ],
-            "desc": "ETRS89 to OSGB36 using OSTN15 grid",
-        },
-        # UK OSTN15 with explicit PROJ pipeline (ETRS89 to OSGB36)
-        # Uses hgridshift with inverse to transform from ETRS89 to OSGB36
-        {
-            "name": "proj_pipeline_ostn15",
-            "from_crs": "ETRS89_pipeline",  # Special marker for pipeline
-            "to_crs": "OSGB36_pipeline",
-            "pipeline": "+proj=pipeline +step +inv +proj=longlat +ellps=GRS80 +step +proj=hgridshift +grids=uk_os_OSTN15_NTv2_OSGBtoETRS.tif +inv +step +proj=longlat +ellps=airy",
-            "grid_file": "uk_os_OSTN15_NTv2_OSGBtoETRS.tif",
-            "test_points": [
-                {"name": "london", "lon": -0.1276, "lat": 51.5074},
-                {"name": "edinburgh", "lon": -3.1883, "lat": 55.9533},
-                {"name": "cardiff", "lon": -3.1791, "lat": 51.4816},
-                {"name": "manchester", "lon": -2.2426, "lat": 53.4808},
-                {"name": "birmingham", "lon": -1.8904, "lat": 52.4862},
-            ],
-            "desc": "ETRS89 to OSGB36 using PROJ pipeline with hgridshift",
-        },
-        # UK OSTN15 with explicit +nadgrids (Forward: ETRS89 to OSGB36)
-        # This test case uses explicit PROJ strings that proj4sedona can execute
-        # Note: We use EPSG transformer for reference values since pyproj +nadgrids doesn't work for OSTN15
-        {
-            "name": "proj_nadgrids_ostn15_forward",
-            "from_crs": "+proj=longlat +ellps=GRS80 +no_defs",  # ETRS89
-            "to_crs": "+proj=longlat +ellps=airy +nadgrids=@uk_os_OSTN15_NTv2_OSGBtoETRS.tif +no_defs",  # OSGB36 with grid
-            "grid_file": "uk_os_OSTN15_NTv2_OSGBtoETRS.tif",
-            "test_points": [
-                {"name": "london", "lon": -0.1276, "lat": 51.5074},
-                {"name": "edinburgh", "lon": -3.1883, "lat": 55.9533},
-                {"name": "cardiff", "lon": -3.1791, "lat": 51.4816},
-                {"name": "manchester", "lon": -2.2426, "lat": 53.4808},
-                {"name": "birmingham", "lon": -1.8904, "lat": 52.4862},
-            ],
-            "desc": "ETRS89 to OSGB36 using explicit +nadgrids (forward direction)",
-            "reference_transformer": (
-                "EPSG:4258",
-                "EPSG:4277",
-            ),  # Use EPSG for reference
-        },
-        # UK OSTN15 with explicit +nadgrids (Inverse: OSGB36 to ETRS89)
-        # This test case uses explicit PROJ strings that proj4sedona can execute
-        # Note: We use EPSG transformer for reference values since pyproj +nadgrids doesn't work for OSTN15
-        {
-            "name": "proj_nadgrids_ostn15_inverse",
-            "from_crs": "+proj=longlat +ellps=airy +nadgrids=@uk_os_OSTN15_NTv2_OSGBtoETRS.tif +no_defs",  # OSGB36 with grid
-            "to_crs": "+proj=longlat +ellps=GRS80 +no_defs",  # ETRS89
-            "grid_file": "uk_os_OSTN15_NTv2_OSGBtoETRS.tif",
-            "test_points": [
-                # Use OSGB36 coordinates (from EPSG:4258->EPSG:4277 forward transform)
-                {
-                    "name": "london",
-                    "lon": -0.12601865501757062,
-                    "lat": 51.506888185279635,
-                },
-                {
-                    "name": "edinburgh",
-                    "lon": -3.1868736941194284,
-                    "lat": 55.95336278929409,
-                },
-                {"name": "cardiff", "lon": -3.177835328022739, "lat": 51.4811301825721},
-                {
-                    "name": "manchester",
-                    "lon": -2.2411629558334205,
-                    "lat": 53.48053580324155,
-                },
-                {
-                    "name": "birmingham",
-                    "lon": -1.8889628322226104,
-                    "lat": 52.48581568047493,
-                },
-            ],
-            "desc": "OSGB36 to ETRS89 using explicit +nadgrids (inverse direction)",
-            "reference_transformer": (
-                "EPSG:4277",
-                "EPSG:4258",
-            ),  # Use EPSG for reference
-        },
+    return _GRID_TEST_CASES
+
+
+@lru_cache(maxsize=None)
+def _get_crs(crs_str: str) -> "CRS":
+    """Parse a CRS definition, memoized across test cases."""
+    from pyproj import CRS
+
+    return CRS(crs_str)
+
+
+@lru_cache(maxsize=None)
+def _get_transformer(from_crs_str: str, to_crs_str: str) -> "Transformer":
+    """Build the best transformer for a CRS pair, memoized across test cases."""
+    from pyproj import Transformer
+
+    return Transformer.from_crs(
+        _get_crs(from_crs_str), _get_crs(to_crs_str), always_xy=True
+    )
+
+
+@lru_cache(maxsize=None)
+def _get_transformer_group_info(from_crs_str: str, to_crs_str: str) -> Dict[str, Any]:
+    """Summarize the transformations PROJ offers for a CRS pair, memoized across test cases."""
+    from pyproj.transformer import TransformerGroup
+
+    tg = TransformerGroup(
+        _get_crs(from_crs_str), _get_crs(to_crs_str), always_xy=True
+    )
+    return {
+        "num_transformers": len(tg.transformers),
+        "best_accuracy": tg.best_available if hasattr(tg, "best_available") else None,
+    }
+
+
+@lru_cache(maxsize=None)
+def _get_pipeline_transformer(pipeline: str) -> "Transformer":
+    """Build a transformer from an explicit PROJ pipeline, memoized across test cases."""
+    from pyproj import Transformer
+
+    return Transformer.from_pipeline(pipeline)
+
+
+def _transformation_key(test_case: Dict[str, Any]) -> Tuple[str, ...]:
+    """Identify the transformation a test case is evaluated with."""
+    if "pipeline" in test_case:
+        return ("pipeline", test_case["pipeline"])
+    from_crs, to_crs = test_case.get("reference_transformer") or (
+        test_case["from_crs"],
+        test_case["to_crs"],
+    )
+    return ("crs", from_crs, to_crs)
+
+
+def _point_arrays(test_points: List[Dict]) -> Tuple[np.ndarray, np.ndarray]:
+    """Pack test point longitudes and latitudes into float64 arrays."""
+    lons = np.fromiter(
+        (p["lon"] for p in test_points), dtype=np.float64, count=len(test_points)
+    )
+    lats = np.fromiter(
+        (p["lat"] for p in test_points), dtype=np.float64, count=len(test_points)
+    )
+    return lons, lats
+
+
+def prefetch_grids(grid_files: List[str], verbose: bool = False) -> None:
+    """Download grid files that are missing locally into PROJ's user data directory.
+
+    PROJ reads a grid in the user data directory straight from disk instead of
+    issuing HTTP range requests to cdn.proj.org for every uncached tile, and
+    the file is kept for later runs (the same layout projsync uses). Failures
+    are not fatal: PROJ then falls back to reading the grid over the network.
+    """
+    from urllib.request import urlretrieve
+
+    from pyproj.datadir import get_data_dir, get_user_data_dir
+    from pyproj.sync import get_proj_endpoint
+
+    user_dir = get_user_data_dir(True)
+    search_dirs = [user_dir] + get_data_dir().split(os.pathsep)
+
+    def fetch(grid_file: str) -> None:
+        if any(os.path.exists(os.path.join(d, grid_file)) for d in search_dirs):
+            return
+        if verbose:
+            print(f"  Fetching grid: {grid_file}")
+        part_path = os.path.join(user_dir, f"{grid_file}.part")
+        try:
+            urlretrieve(f"{get_proj_endpoint()}/{grid_file}", part_path)
+            os.replace(part_path, os.path.join(user_dir, grid_file))
+        except Exception as e:
+            if verbose:
+                print(f"  Could not fetch {grid_file}: {e}")
+        finally:
+            if os.path.exists(part_path):
+                os.remove(part_path)
+
+    with ThreadPoolExecutor(max_workers=len(grid_files) or 1) as executor:
+        list(executor.map(fetch, grid_files))
+
+
+def _last_operation_info(transformer: "Transformer") -> Dict[str, Any]:
+    """Describe the operation PROJ used for the transformer's last transform.
+
+    When a CRS pair has several candidate operations, PROJ only picks one in
+    proj_trans, so Transformer.description and accuracy are placeholders. Each
+    thread has its own copy of the transformer, so this must be called in the
+    thread that transformed, after transforming. Returns an empty dict when no
+    operation is known (nothing was transformed, or pyproj < 3.4).
+    """
+    try:
+        operation = transformer.get_last_used_operation()
+    except Exception:
+        return {}
+    return {"description": operation.description, "accuracy": operation.accuracy}
+
+
+def _transform_group(
+    key: Tuple[str, ...], points: Tuple[np.ndarray, np.ndarray]
+) -> Optional[Tuple[np.ndarray, np.ndarray, Dict[str, Any]]]:
+    """Transform one group's points, or return None if the transformation fails.
+
+    The outputs are returned with the _last_operation_info of the transform,
+    read here because it is only available in this thread; it describes the
+    last point, so it is left empty when that point did not transform.
+    """
+    import pyproj
+
+    # Network access is per PROJ context, and each thread has its own context
+    pyproj.network.set_network_enabled(True)
+    try:
+        if key[0] == "pipeline":
+            transformer = _get_pipeline_transformer(key[1])
+        else:
+            transformer = _get_transformer(key[1], key[2])
+        xs_out, ys_out = transformer.transform(*points)
+    except Exception:
+        return None
+    if len(xs_out) and np.isfinite(xs_out[-1]) and np.isfinite(ys_out[-1]):
+        return xs_out, ys_out, _last_operation_info(transformer)
+    return xs_out, ys_out, {}
+
+
+def batch_transform_test_cases(
+    test_cases: Sequence[Dict[str, Any]],
+    case_points: Optional[Sequence[Tuple[np.ndarray, np.ndarray]]] = None,
+) -> List[Optional[Tuple[np.ndarray, np.ndarray, Dict[str, Any]]]]:
+    """Transform the points of all test cases with one PROJ call per transformation.
+
+    Test cases that are evaluated with the same transformation (same pipeline,
+    or same CRS pair after applying reference_transformer) have their points
+    concatenated and transformed together, with the groups run on a thread
+    pool; the outputs are sliced back per case, as (xs, ys, operation) with
+    the group's _last_operation_info. An entry is None when its
+    group could not be transformed, in which case transform_with_grid
+    transforms that case on its own.
+
+    case_points optionally gives each test case's points already packed by
+    _point_arrays, so they are not packed again here.
+    """
+    if case_points is None:
+        case_points = [_point_arrays(tc["test_points"]) for tc in test_cases]
+
+    groups: Dict[Tuple[str, ...], List[int]] = {}
+    for i, test_case in enumerate(test_cases):
+        groups.setdefault(_transformation_key(test_case), []).append(i)
+
+    keys = list(groups)
+    point_arrays = [
+        (
+            np.concatenate([case_points[i][0] for i in groups[key]]),
+            np.concatenate([case_points[i][1] for i in groups[key]]),
+        )
+        for key in keys
     ]
 
+    # Groups use different grids, so their downloads and transforms can overlap
+    with ThreadPoolExecutor(max_workers=len(keys) or 1) as executor:
+        group_outputs = list(executor.map(_transform_group, keys, point_arrays))
+
+    outputs: List[Optional[Tuple[np.ndarray, np.ndarray, Dict[str, Any]]]] = [
+        None
+    ] * len(test_cases)
+    for key, group_output in zip(keys, group_outputs):
+        if group_output is None:
+            continue
+        xs_out, ys_out, operation = group_output
+        offset = 0
+        for i in groups[key]:
+            end = offset + len(test_cases[i]["test_points"])
+            outputs[i] = (xs_out[offset:end], ys_out[offset:end], operation)
+            offset = end
+
+    return outputs
+
+
+def _empty_columns() -> Dict[str, List]:
+    """Return an empty column-oriented transformations record."""
+    return {
+        "names": [],
+        "inputs": {"x": [], "y": []},
+        "outputs": {"x": [], "y": []},
+        "errors": [],
+    }
+
 
 def transform_with_grid(
     from_crs_str: str,
@@ -156,6 +368,9 @@ def transform_with_grid(
     verbose: bool = False,
     pipeline: str = None,
     reference_transformer: tuple = None,
+    outputs: Optional[Tuple[np.ndarray, np.ndarray, Dict[str, Any]]] = None,
+    list_alternatives: bool = False,
+    points: Optional[Tuple[np.ndarray, np.ndarray]] = None,
 ) -> Dict[str, Any]:
     """Perform transformation and return results.
 
@@ -163,12 +378,19 @@ def transform_with_grid(
         reference_transformer: Optional tuple of (from_crs, to_crs) EPSG codes to use
                               for computing reference values when the primary CRS
                               definition doesn't work properly in pyproj.
+        outputs: Optional precomputed (xs, ys, operation) for test_points, as
+                 produced by batch_transform_test_cases.
+        list_alternatives: Also report how many transformations PROJ offers for
+                           the CRS pair (num_transformers, best_accuracy); these
+                           keys are omitted from transformer_info otherwise.
+        points: Optional (lons, lats) arrays of test_points, as packed by
+                _point_arrays.
     """
 
     result = {
         "from_crs": from_crs_str,
         "to_crs": to_crs_str,
-        "transformations": [],
+        "transformations": _empty_columns(),
         "transformer_info": {},
         "error": None,
     }
@@ -176,7 +398,7 @@ def transform_with_grid(
     try:
         if pipeline:
             # Use explicit pipeline
-            transformer = Transformer.from_pipeline(pipeline)
+            transformer = _get_pipeline_transformer(pipeline)
             result["transformer_info"] = {
                 "pipeline": pipeline,
                 "type": "explicit_pipeline",
@@ -184,9 +406,7 @@ def transform_with_grid(
         elif reference_transformer:
             # Use EPSG-based transformer for reference values
             ref_from, ref_to = reference_transformer
-            from_crs = CRS(ref_from)
-            to_crs = CRS(ref_to)
-            transformer = Transformer.from_crs(from_crs, to_crs, always_xy=True)
+            transformer = _get_transformer(ref_from, ref_to)
             result["transformer_info"] = {
                 "reference_from": ref_from,
                 "reference_to": ref_to,
@@ -194,43 +414,69 @@ def transform_with_grid(
                 "note": "Using EPSG transformer for reference values",
             }
         else:
-            from_crs = CRS(from_crs_str)
-            to_crs = CRS(to_crs_str)
-
-            # Get transformer group to see available transformations
-            tg = TransformerGroup(from_crs, to_crs, always_xy=True)
-
-            result["transformer_info"] = {
-                "num_transformers": len(tg.transformers),
-                "best_accuracy": tg.best_available
-                if hasattr(tg, "best_available")
-                else None,
-            }
-
-            # Use the best transformer
-            transformer = Transformer.from_crs(from_crs, to_crs, always_xy=True)
+            # Use the best transformer, which Transformer.from_crs already selects;
+            # the operation it ran is described once the points are transformed
+            transformer = _get_transformer(from_crs_str, to_crs_str)
+
+            # Enumerating the transformer group is a second full PROJ operation
+            # search, so num_transformers and best_accuracy are only recorded
+            # when the caller asked for the alternatives
+            if list_alternatives:
+                result["transformer_info"].update(
+                    _get_transformer_group_info(from_crs_str, to_crs_str)
+                )
 
-        for point in test_points:
+        xs_in, ys_in = points if points is not None else _point_arrays(test_points)
+        operation = None
+        if outputs is not None:
+            xs_out, ys_out, operation = outputs
+        else:
+            # Transform all points in a single PROJ call
             try:
-                x_out, y_out = transformer.transform(point["lon"], point["lat"])
-
-                result["transformations"].append(
-                    {
-                        "point_name": point["name"],
-                        "input": {"x": point["lon"], "y": point["lat"]},
-                        "output": {"x": float(x_out), "y": float(y_out)},
-                        "error": None,
-                    }
-                )
-            except Exception as e:
-                result["transformations"].append(
-                    {
-                        "point_name": point["name"],
-                        "input": {"x": point["lon"], "y": point["lat"]},
-                        "output": None,
-                        "error": str(e),
-                    }
+                xs_out, ys_out = transformer.transform(xs_in, ys_in)
+            except Exception:
+                xs_out = ys_out = None
+
+        if xs_out is None:
+            # Batch call failed; retry point by point to isolate the error
+            xs_out = np.full(len(test_points), np.nan)
+            ys_out = np.full(len(test_points), np.nan)
+            errors = [None] * len(test_points)
+            for i, point in enumerate(test_points):
+                try:
+                    xs_out[i], ys_out[i] = transformer.transform(
+                        point["lon"], point["lat"]
+                    )
+                except Exception as e:
+                    errors[i] = str(e)
+        else:
+            errors = [None] * len(test_points)
+
+        # Missing grids surface as inf rather than an exception
+        finite = np.isfinite(xs_out) & np.isfinite(ys_out)
+        outputs_x = xs_out.tolist()
+        outputs_y = ys_out.tolist()
+        for i in np.flatnonzero(~finite).tolist():
+            outputs_x[i] = outputs_y[i] = None
+            if errors[i] is None:
+                errors[i] = "Transformation returned non-finite coordinates"
+
+        if not pipeline and not reference_transformer:
+            # The last used operation is that of the last point
+            if operation is None:
+                operation = (
+                    _last_operation_info(transformer)
+                    if finite.size and finite[-1]
+                    else {}
                 )
+            result["transformer_info"] = {**operation, **result["transformer_info"]}
+
+        result["transformations"] = {
+            "names": [point["name"] for point in test_points],
+            "inputs": {"x": xs_in.tolist(), "y": ys_in.tolist()},
+            "outputs": {"x": outputs_x, "y": outputs_y},
+            "errors": errors,
+        }
 
     except Exception as e:
         result["error"] = str(e)
@@ -238,62 +484,91 @@ def transform_with_grid(
     return result
 
 
-def generate_grid_reference(output_file: str, verbose: bool = False) -> None:
+def process_grid_test_case(
+    test_case: Dict[str, Any],
+    verbose: bool = False,
+    outputs: Optional[Tuple[np.ndarray, np.ndarray, Dict[str, Any]]] = None,
+    list_alternatives: bool = False,
+    points: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+) -> Dict[str, Any]:
+    """Run one grid test case and build its reference entry."""
+    if verbose:
+        print(f"  Processing: {test_case['name']}")
+
+    transform_result = transform_with_grid(
+        test_case["from_crs"],
+        test_case["to_crs"],
+        test_case["test_points"],
+        verbose,
+        pipeline=test_case.get("pipeline"),
+        reference_transformer=test_case.get("reference_transformer"),
+        outputs=outputs,
+        list_alternatives=list_alternatives,
+        points=points,
+    )
+
+    case_data = {
+        "name": test_case["name"],
+        "description": test_case["desc"],
+        "grid_file": test_case["grid_file"],
+        "from_crs": test_case["from_crs"],
+        "to_crs": test_case["to_crs"],
+        "transform_result": transform_result,
+    }
+
+    # Add pipeline to output if present
+    if "pipeline" in test_case:
+        case_data["pipeline"] = test_case["pipeline"]
+
+    return case_data
+
+
+def generate_grid_reference(
+    output_file: str, verbose: bool = False, list_alternatives: bool = False
+) -> None:
     """Generate grid transformation reference data."""
 
-    reference_data = {
+    # Get pyproj version and data directory
+    import pyproj
+
+    header = {
         "version": "1.0",
         "generator": "pyproj",
-        "pyproj_version": None,
-        "proj_data_dir": None,
+        "pyproj_version": pyproj.__version__,
+        "proj_data_dir": pyproj.datadir.get_data_dir(),
         "notes": [
-            "Grid files are fetched from cdn.proj.org by pyproj automatically",
+            "Grid files are downloaded from cdn.proj.org into the PROJ user data directory before transforming",
             "Results may vary slightly based on pyproj/PROJ version and grid file version",
             "Tolerance for grid-based transforms should be ~1cm (0.01m)",
         ],
-        "test_cases": [],
     }
 
-    # Get pyproj version and data directory
-    import pyproj
-
-    reference_data["pyproj_version"] = pyproj.__version__
-    reference_data["proj_data_dir"] = pyproj.datadir.get_data_dir()
-
     # Enable network for grid downloads
     pyproj.network.set_network_enabled(True)
 
-    for test_case in get_grid_test_cases():
-        if verbose:
-            print(f"  Processing: {test_case['name']}")
-
-        transform_result = transform_with_grid(
-            test_case["from_crs"],
-            test_case["to_crs"],
-            test_case["test_points"],
+    # Transform the points of all test cases up front, one PROJ call per
+    # distinct transformation, then stream each test case to the file
+    grid_test_cases = get_grid_test_cases()
+    prefetch_grids(
+        list(dict.fromkeys(test_case["grid_file"] for test_case in grid_test_cases)),
+        verbose,
+    )
+    # Pack each test case's points once; the batch and per-case passes share them
+    case_points = [_point_arrays(tc["test_points"]) for tc in grid_test_cases]
+    batch_outputs = batch_transform_test_cases(grid_test_cases, case_points)
+    test_cases = (
+        process_grid_test_case(
+            test_case,
             verbose,
-            pipeline=test_case.get("pipeline"),
-            reference_transformer=test_case.get("reference_transformer"),
+            outputs=outputs,
+            list_alternatives=list_alternatives,
+            points=points,
         )
-
-        case_data = {
-            "name": test_case["name"],
-            "description": test_case["desc"],
-            "grid_file": test_case["grid_file"],
-            "from_crs": test_case["from_crs"],
-            "to_crs": test_case["to_crs"],
-            "transform_result": transform_result,
-        }
-
-        # Add pipeline to output if present
-        if "pipeline" in test_case:
-            case_data["pipeline"] = test_case["pipeline"]
-
-        reference_data["test_cases"].append(case_data)
-
-    # Write output
-    with open(output_file, "w") as f:
-        json.dump(reference_data, f, indent=2)
+        for test_case, points, outputs in zip(
+            grid_test_cases, case_points, batch_outputs
+        )
+    )
+    write_json_stream(output_file, header, {"test_cases": test_cases})
 
 
 if __name__ == "__main__":
@@ -302,7 +577,12 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--output", "-o", default="grid_transform_reference.json")
     parser.add_argument("--verbose", "-v", action="store_true")
+    parser.add_argument(
+        "--list-alternatives",
+        action="store_true",
+        help="Report how many transformations PROJ offers for each CRS pair",
+    )
     args = parser.parse_args()
 
-    generate_grid_reference(args.output, args.verbose)
+    generate_grid_reference(args.output, args.verbose, args.list_alternatives)
     print(f"Generated: {args.output}")
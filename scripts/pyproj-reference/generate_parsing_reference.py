@@ -10,137 +10,256 @@ This script generates test cases for CRS parsing from various formats:
 - PROJJSON strings
 """
 
-import json
-from typing import Dict, List, Any, Optional
-from pyproj import CRS
+import re
+import warnings
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, Iterator, List, Any, Optional, Tuple
 
+from reference_json import write_json_stream
 
-def get_epsg_test_cases() -> List[Dict[str, Any]]:
+if TYPE_CHECKING:
+    from pyproj import CRS
+
+# Exporting a CRS parsed from EPSG/WKT to a PROJ string warns about lossy
+# conversion; the proj_string field is expected to be lossy, so silence it
+warnings.filterwarnings(
+    "ignore",
+    message="You will likely lose important projection information",
+    category=UserWarning,
+    module=r"pyproj\.crs",
+)
+
+# Cheap shape check for PROJ strings: "+proj=..." (or "+init=...") followed by
+# "+key" / "+key=value" tokens
+_PROJ_STRING_RE = re.compile(r"^\s*\+(proj|init)=\S+(\s+\+\w+(=\S*)?)*\s*$")
+
+
+@lru_cache(maxsize=None)
+def _get_crs(crs_str: str) -> "CRS":
+    """Parse a CRS definition, memoized across test cases."""
+    from pyproj import CRS
+    
+    return CRS(crs_str)
+
+
+_EPSG_TEST_CASES = (
+    {"code": "EPSG:4326", "desc": "WGS84 Geographic"},
+    {"code": "EPSG:3857", "desc": "Web Mercator"},
+    {"code": "EPSG:4269", "desc": "NAD83 Geographic"},
+    {"code": "EPSG:32610", "desc": "WGS84 UTM Zone 10N"},
+    {"code": "EPSG:32632", "desc": "WGS84 UTM Zone 32N"},
+    {"code": "EPSG:32733", "desc": "WGS84 UTM Zone 33S"},
+    {"code": "EPSG:4277", "desc": "OSGB36 Geographic"},
+    {"code": "EPSG:5041", "desc": "UPS North"},
+    {"code": "EPSG:5042", "desc": "UPS South"},
+    {"code": "EPSG:2154", "desc": "RGF93 / Lambert-93 (France)"},
+)
+
+
+def get_epsg_test_cases() -> Tuple[Dict[str, Any], ...]:
     """Define EPSG codes to test parsing."""
-    return [
-        {"code": "EPSG:4326", "desc": "WGS84 Geographic"},
-        {"code": "EPSG:3857", "desc": "Web Mercator"},
-        {"code": "EPSG:4269", "desc": "NAD83 Geographic"},
-        {"code": "EPSG:32610", "desc": "WGS84 UTM Zone 10N"},
-        {"code": "EPSG:32632", "desc": "WGS84 UTM Zone 32N"},
-        {"code": "EPSG:32733", "desc": "WGS84 UTM Zone 33S"},
-        {"code": "EPSG:4277", "desc": "OSGB36 Geographic"},
-        {"code": "EPSG:5041", "desc": "UPS North"},
-        {"code": "EPSG:5042", "desc": "UPS South"},
-        {"code": "EPSG:2154", "desc": "RGF93 / Lambert-93 (France)"},
-    ]
+    return _EPSG_TEST_CASES
+
+
+_PROJ_STRING_TEST_CASES = (
+    {
+        "proj_string": "+proj=longlat +datum=WGS84 +no_defs",
+        "desc": "WGS84 Geographic"
+    },
+    {
+        "proj_string": "+proj=merc +a=6378137 +b=6378137 +lat_ts=0 +lon_0=0 +x_0=0 +y_0=0 +k=1 +units=m +no_defs",
+        "desc": "Web Mercator"
+    },
+    {
+        "proj_string": "+proj=utm +zone=32 +datum=WGS84 +units=m +no_defs",
+        "desc": "UTM Zone 32N"
+    },
+    {
+        "proj_string": "+proj=utm +zone=33 +south +datum=WGS84 +units=m +no_defs",
+        "desc": "UTM Zone 33S"
+    },
+    {
+        "proj_string": "+proj=lcc +lat_1=33 +lat_2=45 +lat_0=39 +lon_0=-96 +x_0=0 +y_0=0 +datum=WGS84 +units=m +no_defs",
+        "desc": "Lambert Conformal Conic"
+    },
+    {
+        "proj_string": "+proj=tmerc +lat_0=0 +lon_0=9 +k=0.9996 +x_0=500000 +y_0=0 +datum=WGS84 +units=m +no_defs",
+        "desc": "Transverse Mercator"
+    },
+    {
+        "proj_string": "+proj=stere +lat_0=90 +lon_0=0 +k=0.994 +x_0=2000000 +y_0=2000000 +datum=WGS84 +units=m +no_defs",
+        "desc": "Polar Stereographic North"
+    },
+    {
+        "proj_string": "+proj=aea +lat_1=29.5 +lat_2=45.5 +lat_0=23 +lon_0=-96 +x_0=0 +y_0=0 +datum=NAD83 +units=m +no_defs",
+        "desc": "Albers Equal Area Conic"
+    },
+    {
+        "proj_string": "+proj=longlat +ellps=GRS80 +towgs84=0,0,0,0,0,0,0 +no_defs",
+        "desc": "GRS80 with TOWGS84"
+    },
+)
 
 
-def get_proj_string_test_cases() -> List[Dict[str, Any]]:
+def get_proj_string_test_cases() -> Tuple[Dict[str, Any], ...]:
     """Define PROJ strings to test parsing."""
-    return [
-        {
-            "proj_string": "+proj=longlat +datum=WGS84 +no_defs",
-            "desc": "WGS84 Geographic"
-        },
-        {
-            "proj_string": "+proj=merc +a=6378137 +b=6378137 +lat_ts=0 +lon_0=0 +x_0=0 +y_0=0 +k=1 +units=m +no_defs",
-            "desc": "Web Mercator"
-        },
-        {
-            "proj_string": "+proj=utm +zone=32 +datum=WGS84 +units=m +no_defs",
-            "desc": "UTM Zone 32N"
-        },
-        {
-            "proj_string": "+proj=utm +zone=33 +south +datum=WGS84 +units=m +no_defs",
-            "desc": "UTM Zone 33S"
-        },
-        {
-            "proj_string": "+proj=lcc +lat_1=33 +lat_2=45 +lat_0=39 +lon_0=-96 +x_0=0 +y_0=0 +datum=WGS84 +units=m +no_defs",
-            "desc": "Lambert Conformal Conic"
-        },
-        {
-            "proj_string": "+proj=tmerc +lat_0=0 +lon_0=9 +k=0.9996 +x_0=500000 +y_0=0 +datum=WGS84 +units=m +no_defs",
-            "desc": "Transverse Mercator"
-        },
-        {
-            "proj_string": "+proj=stere +lat_0=90 +lon_0=0 +k=0.994 +x_0=2000000 +y_0=2000000 +datum=WGS84 +units=m +no_defs",
-            "desc": "Polar Stereographic North"
-        },
-        {
-            "proj_string": "+proj=aea +lat_1=29.5 +lat_2=45.5 +lat_0=23 +lon_0=-96 +x_0=0 +y_0=0 +datum=NAD83 +units=m +no_defs",
-            "desc": "Albers Equal Area Conic"
-        },
-        {
-            "proj_string": "+proj=longlat +ellps=GRS80 +towgs84=0,0,0,0,0,0,0 +no_defs",
-            "desc": "GRS80 with TOWGS84"
-        },
-    ]
+    return _PROJ_STRING_TEST_CASES
+
+
+# PROJJSON CRS types whose pyproj type_name does not depend on the axis count
+_TYPE_NAMES = {
+    "ProjectedCRS": "Projected CRS",
+    "BoundCRS": "Bound CRS",
+    "CompoundCRS": "Compound CRS",
+    "VerticalCRS": "Vertical CRS",
+    "EngineeringCRS": "Engineering CRS",
+}
+
+
+def _component_crs(crs_json: Dict[str, Any], index: int = 0) -> Dict[str, Any]:
+    """Return the PROJJSON CRS that pyproj's is_* properties are evaluated on.
+    
+    Like pyproj, this is the index-th component of a compound CRS and the
+    source CRS of a bound CRS.
+    """
+    if crs_json["type"] == "CompoundCRS":
+        crs_json = crs_json["components"][index]
+    if crs_json["type"] == "BoundCRS":
+        crs_json = crs_json["source_crs"]
+    return crs_json
 
 
-def extract_crs_params(crs: CRS) -> Dict[str, Any]:
-    """Extract key parameters from a CRS object."""
+def _unit_name(unit: Any) -> Optional[str]:
+    """Return the name of a PROJJSON unit, which is either a name or an object."""
+    return unit["name"] if isinstance(unit, dict) else unit
+
+
+def extract_crs_params(
+    crs: "CRS", crs_json: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """Extract key parameters from a CRS object.
+    
+    The values are read from the PROJJSON export of the CRS rather than one
+    pyproj property (and PROJ call) at a time. Pass crs_json when the caller
+    has already exported it with crs.to_json_dict().
+    """
+    if crs_json is None:
+        crs_json = crs.to_json_dict()
+    crs_type = crs_json["type"]
+    horizontal = _component_crs(crs_json)
+    if crs_type == "GeographicCRS":
+        type_name = f"Geographic {len(crs_json['coordinate_system']['axis'])}D CRS"
+    else:
+        type_name = _TYPE_NAMES.get(crs_type) or crs.type_name
+    if crs_type == "CompoundCRS":
+        is_vertical = (
+            len(crs_json["components"]) > 1
+            and _component_crs(crs_json, 1)["type"] == "VerticalCRS"
+        )
+    else:
+        is_vertical = horizontal["type"] == "VerticalCRS"
+    
     params = {
-        "name": crs.name,
-        "type_name": crs.type_name,
-        "is_geographic": crs.is_geographic,
-        "is_projected": crs.is_projected,
-        "is_compound": crs.is_compound,
-        "is_vertical": crs.is_vertical,
-        "is_engineering": crs.is_engineering,
+        "name": crs_json.get("name", horizontal.get("name")),
+        "type_name": type_name,
+        "is_geographic": horizontal["type"] in ("GeographicCRS", "DerivedGeographicCRS"),
+        "is_projected": horizontal["type"] == "ProjectedCRS",
+        "is_compound": crs_type == "CompoundCRS",
+        "is_vertical": is_vertical,
+        "is_engineering": horizontal["type"] == "EngineeringCRS",
     }
     
-    # Get ellipsoid info
-    if crs.ellipsoid:
+    geodetic = horizontal.get("base_crs", horizontal)
+    if horizontal["type"] == "VerticalCRS":
+        # pyproj reports no datum for some vertical CRSs whose PROJJSON has
+        # one (e.g. EPSG:5799, EPSG:9451), so take it from the CRS itself
+        datum = {"name": crs.datum.name} if crs.datum else None
+    else:
+        datum = geodetic.get("datum") or geodetic.get("datum_ensemble")
+    
+    # Get ellipsoid info; PROJJSON rounds the axes and inverse flattening to
+    # 15 significant digits (and may give them in another unit), so it is only
+    # used to tell whether there is an ellipsoid and the values come from PROJ
+    if datum and datum.get("ellipsoid"):
+        ellipsoid = crs.ellipsoid
         params["ellipsoid"] = {
-            "name": crs.ellipsoid.name,
-            "semi_major_metre": crs.ellipsoid.semi_major_metre,
-            "semi_minor_metre": crs.ellipsoid.semi_minor_metre,
-            "inverse_flattening": crs.ellipsoid.inverse_flattening,
+            "name": ellipsoid.name,
+            "semi_major_metre": ellipsoid.semi_major_metre,
+            "semi_minor_metre": ellipsoid.semi_minor_metre,
+            "inverse_flattening": ellipsoid.inverse_flattening,
         }
     
     # Get datum info
-    if crs.datum:
+    if datum:
         params["datum"] = {
-            "name": crs.datum.name,
+            "name": datum["name"],
         }
     
     # Get coordinate operation params if projected
-    if crs.is_projected:
+    if params["is_projected"]:
+        operation = crs_json.get("conversion") or crs_json.get("transformation")
         params["coordinate_operation"] = {
-            "method_name": crs.coordinate_operation.method_name if crs.coordinate_operation else None,
+            "method_name": operation["method"]["name"] if operation else None,
         }
-        # Get projection parameters
-        if crs.coordinate_operation:
+        # Get projection parameters; PROJJSON rounds them to 15 significant
+        # digits, so the exact values are read from the CRS
+        if operation:
             params["projection_params"] = {}
             for param in crs.coordinate_operation.params:
                 params["projection_params"][param.name] = param.value
     
     # Get axis info
-    params["axis_info"] = []
-    for axis in crs.axis_info:
-        params["axis_info"].append({
-            "name": axis.name,
-            "abbrev": axis.abbrev,
-            "direction": axis.direction,
-            "unit_name": axis.unit_name,
-        })
+    components = crs_json["components"] if crs_type == "CompoundCRS" else [crs_json]
+    params["axis_info"] = [
+        {
+            "name": axis["name"],
+            "abbrev": axis["abbreviation"],
+            "direction": axis["direction"],
+            "unit_name": _unit_name(axis.get("unit")),
+        }
+        for component in components
+        for axis in component.get("source_crs", component)["coordinate_system"]["axis"]
+    ]
     
     return params
 
 
-def generate_parsing_reference(output_file: str, verbose: bool = False) -> None:
-    """Generate parsing reference data."""
+def describe_crs(crs: "CRS") -> Dict[str, Any]:
+    """Export a CRS to every format and extract its parameters in one pass.
     
-    reference_data = {
-        "version": "1.0",
-        "generator": "pyproj",
-        "pyproj_version": None,
-        "epsg_test_cases": [],
-        "proj_string_test_cases": [],
-        "wkt_test_cases": [],
+    PROJJSON is exported once and shared between the parameter extraction and
+    the "projjson" field.
+    """
+    projjson = crs.to_json_dict()
+    return {
+        "parsed_params": extract_crs_params(crs, projjson),
+        "wkt1": crs.to_wkt(version="WKT1_GDAL"),
+        "wkt2": crs.to_wkt(version="WKT2_2019"),
+        "proj_string": crs.to_proj4(),
+        "projjson": projjson,
     }
-    
-    # Get pyproj version
-    import pyproj
-    reference_data["pyproj_version"] = pyproj.__version__
-    
-    # Process EPSG codes
+
+
+@lru_cache(maxsize=None)
+def _describe_definition(definition: str) -> Dict[str, Any]:
+    """Parse and describe a CRS definition, memoized so duplicates are done once."""
+    return describe_crs(_get_crs(definition))
+
+
+def _pyproj_version_tuple(version: str) -> Tuple[int, int]:
+    """Return the (major, minor) numbers of a pyproj version string."""
+    major, minor = version.split(".")[:2]
+    return int(major), int(minor)
+
+
+def _epsg_test_cases(
+    verbose: bool = False, wkt_sources: Optional[List[Dict[str, Any]]] = None
+) -> Iterator[Dict[str, Any]]:
+    """Yield a test case for each EPSG code.
+
+    When wkt_sources is given, the first five cases (failed ones included)
+    are also appended to it to seed the WKT test cases.
+    """
     if verbose:
         print("  Processing EPSG codes...")
     
@@ -149,15 +268,10 @@ def generate_parsing_reference(output_file: str, verbose: bool = False) -> None:
             print(f"    {epsg_case['code']}")
         
         try:
-            crs = CRS(epsg_case["code"])
             test_case = {
                 "input": epsg_case["code"],
                 "description": epsg_case["desc"],
-                "parsed_params": extract_crs_params(crs),
-                "wkt1": crs.to_wkt(version="WKT1_GDAL"),
-                "wkt2": crs.to_wkt(version="WKT2_2019"),
-                "proj_string": crs.to_proj4(),
-                "projjson": crs.to_json_dict(),
+                **_describe_definition(epsg_case["code"]),
                 "error": None
             }
         except Exception as e:
@@ -172,9 +286,13 @@ def generate_parsing_reference(output_file: str, verbose: bool = False) -> None:
                 "error": str(e)
             }
         
-        reference_data["epsg_test_cases"].append(test_case)
-    
-    # Process PROJ strings
+        if wkt_sources is not None and len(wkt_sources) < 5:
+            wkt_sources.append(test_case)
+        yield test_case
+
+
+def _proj_string_test_cases(verbose: bool = False) -> Iterator[Dict[str, Any]]:
+    """Yield a test case for each PROJ string."""
     if verbose:
         print("  Processing PROJ strings...")
     
@@ -183,15 +301,13 @@ def generate_parsing_reference(output_file: str, verbose: bool = False) -> None:
             print(f"    {proj_case['desc']}")
         
         try:
-            crs = CRS(proj_case["proj_string"])
+            # Reject malformed strings before handing them to PROJ
+            if not _PROJ_STRING_RE.match(proj_case["proj_string"]):
+                raise ValueError(f"Invalid PROJ string: {proj_case['proj_string']}")
             test_case = {
                 "input": proj_case["proj_string"],
                 "description": proj_case["desc"],
-                "parsed_params": extract_crs_params(crs),
-                "wkt1": crs.to_wkt(version="WKT1_GDAL"),
-                "wkt2": crs.to_wkt(version="WKT2_2019"),
-                "proj_string": crs.to_proj4(),
-                "projjson": crs.to_json_dict(),
+                **_describe_definition(proj_case["proj_string"]),
                 "error": None
             }
         except Exception as e:
@@ -206,52 +322,100 @@ def generate_parsing_reference(output_file: str, verbose: bool = False) -> None:
                 "error": str(e)
             }
         
-        reference_data["proj_string_test_cases"].append(test_case)
-    
-    # Generate WKT test cases from EPSG codes
+        yield test_case
+
+
+def _wkt_test_cases(
+    epsg_test_cases: List[Dict[str, Any]], verbose: bool = False
+) -> Iterator[Dict[str, Any]]:
+    """Yield WKT1 and WKT2 test cases re-parsed from already exported EPSG cases."""
     if verbose:
         print("  Generating WKT test cases...")
     
-    for epsg_case in get_epsg_test_cases()[:5]:  # Use first 5 EPSG codes
+    # Reuse the WKT already exported for the EPSG codes
+    for epsg_test_case in epsg_test_cases:
+        code = epsg_test_case["input"]
         try:
-            crs = CRS(epsg_case["code"])
-            wkt1 = crs.to_wkt(version="WKT1_GDAL")
-            wkt2 = crs.to_wkt(version="WKT2_2019")
+            if epsg_test_case["error"] is not None:
+                raise ValueError(epsg_test_case["error"])
+            wkt1 = epsg_test_case["wkt1"]
+            wkt2 = epsg_test_case["wkt2"]
             
             # Test parsing WKT1
-            crs_from_wkt1 = CRS(wkt1)
+            crs_from_wkt1 = _get_crs(wkt1)
             wkt1_case = {
                 "input": wkt1,
                 "input_format": "WKT1",
-                "description": f"WKT1 from {epsg_case['code']}",
+                "description": f"WKT1 from {code}",
                 "parsed_params": extract_crs_params(crs_from_wkt1),
                 "error": None
             }
-            reference_data["wkt_test_cases"].append(wkt1_case)
             
             # Test parsing WKT2
-            crs_from_wkt2 = CRS(wkt2)
+            crs_from_wkt2 = _get_crs(wkt2)
             wkt2_case = {
                 "input": wkt2,
                 "input_format": "WKT2",
-                "description": f"WKT2 from {epsg_case['code']}",
+                "description": f"WKT2 from {code}",
                 "parsed_params": extract_crs_params(crs_from_wkt2),
                 "error": None
             }
-            reference_data["wkt_test_cases"].append(wkt2_case)
-            
         except Exception as e:
-            reference_data["wkt_test_cases"].append({
-                "input": epsg_case["code"],
+            yield {
+                "input": code,
                 "input_format": "WKT",
-                "description": f"WKT from {epsg_case['code']}",
+                "description": f"WKT from {code}",
                 "parsed_params": None,
                 "error": str(e)
-            })
+            }
+            continue
+        
+        yield wkt1_case
+        yield wkt2_case
+
+
+def generate_parsing_reference(output_file: str, verbose: bool = False) -> None:
+    """Generate parsing reference data.
+    
+    Test cases are streamed to the output file as they are produced. The WKT
+    cases are derived from the first five EPSG cases, which are kept aside
+    while the EPSG array is written.
+    """
+    
+    # Get pyproj version
+    import pyproj
+    
+    header = {
+        "version": "1.0",
+        "generator": "pyproj",
+        "pyproj_version": pyproj.__version__,
+    }
+    
+    # Sections are consumed in order, so wkt_sources is filled by the time
+    # the WKT generator starts
+    wkt_sources: List[Dict[str, Any]] = []
     
-    # Write output
-    with open(output_file, 'w') as f:
-        json.dump(reference_data, f, indent=2)
+    # Everything here runs on one thread, so share pyproj's global PROJ context
+    # instead of setting one up per object. pyproj 3.7+ already keeps a single
+    # context per thread and deprecates the switch. It is turned back off
+    # afterwards because generate_all may reuse this process for a threaded
+    # generator.
+    use_global_context = _pyproj_version_tuple(pyproj.__version__) < (3, 7)
+    if use_global_context:
+        pyproj.set_use_global_context(True)
+    try:
+        write_json_stream(
+            output_file,
+            header,
+            {
+                "epsg_test_cases": _epsg_test_cases(verbose, wkt_sources),
+                "proj_string_test_cases": _proj_string_test_cases(verbose),
+                "wkt_test_cases": _wkt_test_cases(wkt_sources, verbose),
+            },
+        )
+    finally:
+        if use_global_context:
+            pyproj.set_use_global_context(False)
 
 
 if __name__ == "__main__":
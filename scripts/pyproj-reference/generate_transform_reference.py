@@ -8,246 +8,380 @@ This script generates test cases for coordinate transformations covering:
 - Edge cases (poles, dateline, extreme coordinates)
 """
 
-import json
-from typing import Dict, List, Any
-from pyproj import CRS, Transformer
-from pyproj.exceptions import CRSError
-import numpy as np
+import math
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Any, Sequence, Tuple
 
+from reference_json import write_json_stream
 
-def get_test_coordinates() -> List[Dict[str, Any]]:
+if TYPE_CHECKING:
+    from pyproj import CRS, Transformer
+
+
+_TEST_COORDINATES = (
+    {"name": "origin", "lon": 0.0, "lat": 0.0, "desc": "Origin point"},
+    {"name": "london", "lon": -0.1278, "lat": 51.5074, "desc": "London, UK"},
+    {"name": "new_york", "lon": -74.006, "lat": 40.7128, "desc": "New York City"},
+    {"name": "tokyo", "lon": 139.6917, "lat": 35.6895, "desc": "Tokyo, Japan"},
+    {
+        "name": "sydney",
+        "lon": 151.2093,
+        "lat": -33.8688,
+        "desc": "Sydney, Australia",
+    },
+    {
+        "name": "buenos_aires",
+        "lon": -58.3816,
+        "lat": -34.6037,
+        "desc": "Buenos Aires",
+    },
+    {"name": "cape_town", "lon": 18.4241, "lat": -33.9249, "desc": "Cape Town, SA"},
+    # Edge cases
+    {"name": "north_pole_edge", "lon": 0.0, "lat": 89.9, "desc": "Near North Pole"},
+    {
+        "name": "south_pole_edge",
+        "lon": 0.0,
+        "lat": -89.9,
+        "desc": "Near South Pole",
+    },
+    {
+        "name": "dateline_east",
+        "lon": 179.9,
+        "lat": 0.0,
+        "desc": "Near dateline east",
+    },
+    {
+        "name": "dateline_west",
+        "lon": -179.9,
+        "lat": 0.0,
+        "desc": "Near dateline west",
+    },
+    {"name": "antimeridian", "lon": 180.0, "lat": 45.0, "desc": "On antimeridian"},
+    {
+        "name": "prime_meridian",
+        "lon": 0.0,
+        "lat": 45.0,
+        "desc": "On prime meridian",
+    },
+    # Extreme but valid coordinates
+    {"name": "extreme_north", "lon": 45.0, "lat": 85.0, "desc": "Extreme north"},
+    {"name": "extreme_south", "lon": -45.0, "lat": -85.0, "desc": "Extreme south"},
+)
+
+
+# Test coordinates as float64 buffers, copied per CRS pair and transformed in place
+_TEST_LONS = array("d", (coord["lon"] for coord in _TEST_COORDINATES))
+_TEST_LATS = array("d", (coord["lat"] for coord in _TEST_COORDINATES))
+
+
+def get_test_coordinates() -> Tuple[Dict[str, Any], ...]:
     """Define test coordinates with descriptions."""
-    return [
-        {"name": "origin", "lon": 0.0, "lat": 0.0, "desc": "Origin point"},
-        {"name": "london", "lon": -0.1278, "lat": 51.5074, "desc": "London, UK"},
-        {"name": "new_york", "lon": -74.006, "lat": 40.7128, "desc": "New York City"},
-        {"name": "tokyo", "lon": 139.6917, "lat": 35.6895, "desc": "Tokyo, Japan"},
-        {
-            "name": "sydney",
-            "lon": 151.2093,
-            "lat": -33.8688,
-            "desc": "Sydney, Australia",
-        },
-        {
-            "name": "buenos_aires",
-            "lon": -58.3816,
-            "lat": -34.6037,
-            "desc": "Buenos Aires",
-        },
-        {"name": "cape_town", "lon": 18.4241, "lat": -33.9249, "desc": "Cape Town, SA"},
-        # Edge cases
-        {"name": "north_pole_edge", "lon": 0.0, "lat": 89.9, "desc": "Near North Pole"},
-        {
-            "name": "south_pole_edge",
-            "lon": 0.0,
-            "lat": -89.9,
-            "desc": "Near South Pole",
-        },
-        {
-            "name": "dateline_east",
-            "lon": 179.9,
-            "lat": 0.0,
-            "desc": "Near dateline east",
-        },
-        {
-            "name": "dateline_west",
-            "lon": -179.9,
-            "lat": 0.0,
-            "desc": "Near dateline west",
-        },
-        {"name": "antimeridian", "lon": 180.0, "lat": 45.0, "desc": "On antimeridian"},
-        {
-            "name": "prime_meridian",
-            "lon": 0.0,
-            "lat": 45.0,
-            "desc": "On prime meridian",
-        },
-        # Extreme but valid coordinates
-        {"name": "extreme_north", "lon": 45.0, "lat": 85.0, "desc": "Extreme north"},
-        {"name": "extreme_south", "lon": -45.0, "lat": -85.0, "desc": "Extreme south"},
-    ]
-
-
-def get_crs_pairs() -> List[Dict[str, Any]]:
+    return _TEST_COORDINATES
+
+
+_CRS_PAIRS = (
+    # Common transformations
+    {
+        "name": "wgs84_to_webmerc",
+        "from_crs": "EPSG:4326",
+        "to_crs": "EPSG:3857",
+        "desc": "WGS84 to Web Mercator",
+    },
+    {
+        "name": "webmerc_to_wgs84",
+        "from_crs": "EPSG:3857",
+        "to_crs": "EPSG:4326",
+        "desc": "Web Mercator to WGS84",
+    },
+    {
+        "name": "wgs84_to_utm10n",
+        "from_crs": "EPSG:4326",
+        "to_crs": "EPSG:32610",
+        "desc": "WGS84 to UTM Zone 10N",
+    },
+    {
+        "name": "wgs84_to_utm32n",
+        "from_crs": "EPSG:4326",
+        "to_crs": "EPSG:32632",
+        "desc": "WGS84 to UTM Zone 32N",
+    },
+    {
+        "name": "wgs84_to_utm33s",
+        "from_crs": "EPSG:4326",
+        "to_crs": "EPSG:32733",
+        "desc": "WGS84 to UTM Zone 33S",
+    },
+    # NAD83 transformations
+    {
+        "name": "wgs84_to_nad83",
+        "from_crs": "EPSG:4326",
+        "to_crs": "EPSG:4269",
+        "desc": "WGS84 to NAD83",
+    },
+    # Datum transformations with TOWGS84
+    {
+        "name": "osgb36_to_wgs84",
+        "from_crs": "EPSG:4277",
+        "to_crs": "EPSG:4326",
+        "desc": "OSGB36 to WGS84 (datum shift)",
+    },
+    {
+        "name": "ed50_to_wgs84",
+        "from_crs": "EPSG:4230",
+        "to_crs": "EPSG:4326",
+        "desc": "ED50 to WGS84 (European datum)",
+    },
+    # Lambert Conformal Conic
+    {
+        "name": "wgs84_to_lcc",
+        "from_crs": "EPSG:4326",
+        "to_crs": "+proj=lcc +lat_1=33 +lat_2=45 +lat_0=39 +lon_0=-96 +x_0=0 +y_0=0 +datum=WGS84 +units=m",
+        "desc": "WGS84 to LCC (US)",
+    },
+    # Stereographic (polar)
+    {
+        "name": "wgs84_to_ups_north",
+        "from_crs": "EPSG:4326",
+        "to_crs": "EPSG:5041",
+        "desc": "WGS84 to UPS North",
+    },
+    {
+        "name": "wgs84_to_ups_south",
+        "from_crs": "EPSG:4326",
+        "to_crs": "EPSG:5042",
+        "desc": "WGS84 to UPS South",
+    },
+)
+
+
+def get_crs_pairs() -> Tuple[Dict[str, Any], ...]:
     """Define CRS pairs for transformation tests."""
-    return [
-        # Common transformations
-        {
-            "name": "wgs84_to_webmerc",
-            "from_crs": "EPSG:4326",
-            "to_crs": "EPSG:3857",
-            "desc": "WGS84 to Web Mercator",
-        },
-        {
-            "name": "webmerc_to_wgs84",
-            "from_crs": "EPSG:3857",
-            "to_crs": "EPSG:4326",
-            "desc": "Web Mercator to WGS84",
-        },
-        {
-            "name": "wgs84_to_utm10n",
-            "from_crs": "EPSG:4326",
-            "to_crs": "EPSG:32610",
-            "desc": "WGS84 to UTM Zone 10N",
-        },
-        {
-            "name": "wgs84_to_utm32n",
-            "from_crs": "EPSG:4326",
-            "to_crs": "EPSG:32632",
-            "desc": "WGS84 to UTM Zone 32N",
-        },
-        {
-            "name": "wgs84_to_utm33s",
-            "from_crs": "EPSG:4326",
-            "to_crs": "EPSG:32733",
-            "desc": "WGS84 to UTM Zone 33S",
-        },
-        # NAD83 transformations
-        {
-            "name": "wgs84_to_nad83",
-            "from_crs": "EPSG:4326",
-            "to_crs": "EPSG:4269",
-            "desc": "WGS84 to NAD83",
-        },
-        # Datum transformations with TOWGS84
-        {
-            "name": "osgb36_to_wgs84",
-            "from_crs": "EPSG:4277",
-            "to_crs": "EPSG:4326",
-            "desc": "OSGB36 to WGS84 (datum shift)",
-        },
-        {
-            "name": "ed50_to_wgs84",
-            "from_crs": "EPSG:4230",
-            "to_crs": "EPSG:4326",
-            "desc": "ED50 to WGS84 (European datum)",
-        },
-        # Lambert Conformal Conic
-        {
-            "name": "wgs84_to_lcc",
-            "from_crs": "EPSG:4326",
-            "to_crs": "+proj=lcc +lat_1=33 +lat_2=45 +lat_0=39 +lon_0=-96 +x_0=0 +y_0=0 +datum=WGS84 +units=m",
-            "desc": "WGS84 to LCC (US)",
-        },
-        # Stereographic (polar)
-        {
-            "name": "wgs84_to_ups_north",
-            "from_crs": "EPSG:4326",
-            "to_crs": "EPSG:5041",
-            "desc": "WGS84 to UPS North",
-        },
-        {
-            "name": "wgs84_to_ups_south",
-            "from_crs": "EPSG:4326",
-            "to_crs": "EPSG:5042",
-            "desc": "WGS84 to UPS South",
-        },
-    ]
-
-
-def transform_point(transformer: Transformer, lon: float, lat: float) -> Dict[str, Any]:
-    """Transform a single point and return results."""
+    return _CRS_PAIRS
+
+
+@lru_cache(maxsize=None)
+def _get_crs(crs_str: str) -> "CRS":
+    """Parse a CRS definition, memoized across CRS pairs."""
+    from pyproj import CRS
+
+    return CRS(crs_str)
+
+
+@lru_cache(maxsize=None)
+def _get_transformer(
+    from_crs_str: str, to_crs_str: str, always_xy: bool = True
+) -> "Transformer":
+    """Build the transformer for a CRS pair, memoized across CRS pairs."""
+    from pyproj import Transformer
+
+    return Transformer.from_crs(
+        _get_crs(from_crs_str), _get_crs(to_crs_str), always_xy=always_xy
+    )
+
+
+def _set_global_context(active: bool) -> None:
+    """Switch pyproj to one shared PROJ context for this single-threaded process.
+
+    Saves setting up a context per CRS and transformer on pyproj < 3.7; newer
+    versions keep one context per thread anyway and deprecate the switch, so
+    it is left alone there.
+    """
+    import pyproj
+
+    major, minor = pyproj.__version__.split(".")[:2]
+    if (int(major), int(minor)) < (3, 7):
+        pyproj.set_use_global_context(active)
+
+
+def _empty_transformations() -> Dict[str, Any]:
+    """Return an empty column-oriented transformations record."""
+    return {
+        "names": [],
+        "descriptions": [],
+        "wgs84_reference": {"lon": [], "lat": []},
+        "inputs": {"x": [], "y": []},
+        "outputs": {"x": [], "y": []},
+        "errors": [],
+    }
+
+
+def transform_points(transformer: "Transformer", xs: array, ys: array) -> Dict[str, Any]:
+    """Transform float64 point buffers in one PROJ call and return result columns.
+
+    Returns {"inputs": {"x", "y"}, "outputs": {"x", "y"}, "errors"} with one
+    entry per point; a point that fails has null outputs and an error message.
+    The buffers are transformed in place and hold the outputs afterwards. Falls
+    back to transforming point by point if the batch call raises, so a single
+    bad coordinate only affects its own result.
+    """
+    inputs_x, inputs_y = xs.tolist(), ys.tolist()
+    errors = [None] * len(inputs_x)
     try:
-        x, y = transformer.transform(lon, lat)
-        return {
-            "input": {"x": lon, "y": lat},
-            "output": {"x": float(x), "y": float(y)},
+        transformer.transform(xs, ys, inplace=True)
+        outputs_x, outputs_y = xs.tolist(), ys.tolist()
+    except Exception:
+        outputs_x = [None] * len(inputs_x)
+        outputs_y = [None] * len(inputs_y)
+        for i, (x, y) in enumerate(zip(inputs_x, inputs_y)):
+            try:
+                outputs_x[i], outputs_y[i] = transformer.transform(x, y)
+            except Exception as e:
+                errors[i] = str(e)
+
+    # Points outside the target CRS's domain (e.g. the poles in Mercator)
+    # come back as inf or NaN rather than raising
+    for i, (x, y) in enumerate(zip(outputs_x, outputs_y)):
+        if x is not None and not (math.isfinite(x) and math.isfinite(y)):
+            outputs_x[i] = outputs_y[i] = None
+            if errors[i] is None:
+                errors[i] = "Transformation returned non-finite coordinates"
+
+    return {
+        "inputs": {"x": inputs_x, "y": inputs_y},
+        "outputs": {"x": outputs_x, "y": outputs_y},
+        "errors": errors,
+    }
+
+
+def _transform_each(transformer: "Transformer", xs: array, ys: array) -> None:
+    """Transform point buffers in place one point at a time; failures become NaN."""
+    for i, (x, y) in enumerate(zip(xs.tolist(), ys.tolist())):
+        try:
+            xs[i], ys[i] = transformer.transform(x, y)
+        except Exception:
+            xs[i] = ys[i] = math.nan
+
+
+def _process_case(crs_pair: Dict[str, Any]) -> Dict[str, Any]:
+    """Transform the test coordinates for one CRS pair and build its test case."""
+    test_coords = get_test_coordinates()
+
+    # WGS84 for checking if input transformation is needed
+    wgs84 = _get_crs("EPSG:4326")
+
+    try:
+        from_crs = _get_crs(crs_pair["from_crs"])
+        to_crs = _get_crs(crs_pair["to_crs"])
+        transformer = _get_transformer(crs_pair["from_crs"], crs_pair["to_crs"])
+
+        # Check if we need to transform input coordinates from WGS84 to from_crs
+        # This is needed when from_crs is NOT WGS84 (e.g., webmerc_to_wgs84)
+        need_input_transform = not from_crs.equals(wgs84)
+        input_transformer = None
+        if need_input_transform:
+            input_transformer = _get_transformer("EPSG:4326", crs_pair["from_crs"])
+
+        # Get input coordinates in from_crs coordinate system, in place in a
+        # copy of the test coordinate buffers
+        coords = test_coords
+        xs, ys = array("d", _TEST_LONS), array("d", _TEST_LATS)
+        if need_input_transform:
+            try:
+                input_transformer.transform(xs, ys, inplace=True)
+            except Exception:
+                xs[:], ys[:] = _TEST_LONS, _TEST_LATS
+                _transform_each(input_transformer, xs, ys)
+            # Skip coordinates that can't be represented in from_crs (inf, nan)
+            valid = [
+                i
+                for i, (x, y) in enumerate(zip(xs, ys))
+                if math.isfinite(x) and math.isfinite(y)
+            ]
+            if len(valid) < len(xs):
+                coords = [test_coords[i] for i in valid]
+                xs = array("d", (xs[i] for i in valid))
+                ys = array("d", (ys[i] for i in valid))
+
+        transformations = {
+            "names": [coord["name"] for coord in coords],
+            "descriptions": [coord["desc"] for coord in coords],
+            # Store original WGS84 reference for traceability
+            "wgs84_reference": {
+                "lon": [coord["lon"] for coord in coords],
+                "lat": [coord["lat"] for coord in coords],
+            },
+            **transform_points(transformer, xs, ys),
+        }
+
+        test_case = {
+            "name": crs_pair["name"],
+            "description": crs_pair["desc"],
+            "from_crs": crs_pair["from_crs"],
+            "to_crs": crs_pair["to_crs"],
+            "from_crs_wkt": from_crs.to_wkt(),
+            "to_crs_wkt": to_crs.to_wkt(),
+            "transformations": transformations,
             "error": None,
         }
     except Exception as e:
-        return {"input": {"x": lon, "y": lat}, "output": None, "error": str(e)}
+        test_case = {
+            "name": crs_pair["name"],
+            "description": crs_pair["desc"],
+            "from_crs": crs_pair["from_crs"],
+            "to_crs": crs_pair["to_crs"],
+            "from_crs_wkt": None,
+            "to_crs_wkt": None,
+            "transformations": _empty_transformations(),
+            "error": str(e),
+        }
+
+    return test_case
+
+
+def _report_cases(
+    crs_pairs: Sequence[Dict[str, Any]], test_cases: Iterable[Dict[str, Any]]
+) -> Iterator[Dict[str, Any]]:
+    """Yield the test cases, printing each one's name as it is written.
+
+    Printing here rather than in _process_case keeps the log in the calling
+    process, whose stdout generate_all captures; pool workers have their own.
+    """
+    for crs_pair, test_case in zip(crs_pairs, test_cases):
+        print(f"  Processing: {crs_pair['name']}")
+        yield test_case
 
 
 def generate_transform_reference(output_file: str, verbose: bool = False) -> None:
     """Generate transformation reference data."""
 
-    test_coords = get_test_coordinates()
     crs_pairs = get_crs_pairs()
 
-    reference_data = {
-        "version": "1.0",
-        "generator": "pyproj",
-        "pyproj_version": None,
-        "test_cases": [],
-    }
-
     # Get pyproj version
     import pyproj
 
-    reference_data["pyproj_version"] = pyproj.__version__
-
-    # WGS84 for checking if input transformation is needed
-    wgs84 = CRS("EPSG:4326")
-
-    for crs_pair in crs_pairs:
-        if verbose:
-            print(f"  Processing: {crs_pair['name']}")
+    header = {
+        "version": "1.0",
+        "generator": "pyproj",
+        "pyproj_version": pyproj.__version__,
+    }
 
+    # CRS pairs are independent; ex.map keeps the results in pair order, and
+    # each test case is streamed to the file as soon as it is ready
+    max_workers = min(os.cpu_count() or 1, len(crs_pairs))
+    if max_workers > 1:
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=_set_global_context,
+            initargs=(True,),
+        ) as ex:
+            test_cases = ex.map(_process_case, crs_pairs)
+            if verbose:
+                test_cases = _report_cases(crs_pairs, test_cases)
+            write_json_stream(output_file, header, {"test_cases": test_cases})
+    else:
+        # Restore the default afterwards in case this process runs other,
+        # threaded generators (see generate_all)
+        _set_global_context(True)
         try:
-            from_crs = CRS(crs_pair["from_crs"])
-            to_crs = CRS(crs_pair["to_crs"])
-            transformer = Transformer.from_crs(from_crs, to_crs, always_xy=True)
-
-            # Check if we need to transform input coordinates from WGS84 to from_crs
-            # This is needed when from_crs is NOT WGS84 (e.g., webmerc_to_wgs84)
-            need_input_transform = not from_crs.equals(wgs84)
-            input_transformer = None
-            if need_input_transform:
-                input_transformer = Transformer.from_crs(
-                    wgs84, from_crs, always_xy=True
-                )
-
-            transformations = []
-            for coord in test_coords:
-                # Get input coordinates in from_crs coordinate system
-                if need_input_transform:
-                    try:
-                        input_x, input_y = input_transformer.transform(
-                            coord["lon"], coord["lat"]
-                        )
-                        # Check for invalid results (inf, nan)
-                        if not (np.isfinite(input_x) and np.isfinite(input_y)):
-                            continue
-                    except Exception:
-                        # Skip coordinates that can't be transformed to from_crs
-                        continue
-                else:
-                    input_x, input_y = coord["lon"], coord["lat"]
-
-                result = transform_point(transformer, input_x, input_y)
-                result["coordinate_name"] = coord["name"]
-                result["coordinate_desc"] = coord["desc"]
-                # Store original WGS84 reference for traceability
-                result["wgs84_reference"] = {"lon": coord["lon"], "lat": coord["lat"]}
-                transformations.append(result)
-
-            test_case = {
-                "name": crs_pair["name"],
-                "description": crs_pair["desc"],
-                "from_crs": crs_pair["from_crs"],
-                "to_crs": crs_pair["to_crs"],
-                "from_crs_wkt": from_crs.to_wkt(),
-                "to_crs_wkt": to_crs.to_wkt(),
-                "transformations": transformations,
-                "error": None,
-            }
-        except Exception as e:
-            test_case = {
-                "name": crs_pair["name"],
-                "description": crs_pair["desc"],
-                "from_crs": crs_pair["from_crs"],
-                "to_crs": crs_pair["to_crs"],
-                "from_crs_wkt": None,
-                "to_crs_wkt": None,
-                "transformations": [],
-                "error": str(e),
-            }
-
-        reference_data["test_cases"].append(test_case)
-
-    # Write output
-    with open(output_file, "w") as f:
-        json.dump(reference_data, f, indent=2)
+            test_cases = map(_process_case, crs_pairs)
+            if verbose:
+                test_cases = _report_cases(crs_pairs, test_cases)
+            write_json_stream(output_file, header, {"test_cases": test_cases})
+        finally:
+            _set_global_context(False)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,86 @@
+"""
+JSON output helpers shared by the pyproj reference data generators.
+
+orjson is used when it is installed; otherwise the standard library encoder
+is used, so orjson remains an optional dependency. Non-finite floats are not
+valid JSON and the two encoders disagree on them (orjson writes null, the
+standard library raises), so callers replace NaN and inf with None first.
+
+Files are written to a temporary path next to output_file and moved into
+place only once complete, so a failed run leaves the previous file intact.
+"""
+
+import json
+import os
+from typing import Any, Dict, Iterable
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _dumps(value: Any, level: int = 0) -> str:
+    """Encode value as JSON indented by two spaces, nested `level` levels deep."""
+    if orjson is not None:
+        text = orjson.dumps(
+            value, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY
+        ).decode()
+    else:
+        text = json.dumps(value, indent=2, allow_nan=False)
+    # Encoded strings never contain raw newlines, so this only re-indents structure
+    return text.replace("\n", "\n" + "  " * level) if level else text
+
+
+def write_json(data: Any, output_file: str) -> None:
+    """Write data to output_file as JSON indented by two spaces."""
+    tmp_file = output_file + ".tmp"
+    try:
+        if orjson is not None:
+            with open(tmp_file, "wb") as f:
+                f.write(
+                    orjson.dumps(
+                        data, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY
+                    )
+                )
+        else:
+            with open(tmp_file, "w") as f:
+                json.dump(data, f, indent=2, allow_nan=False)
+        os.replace(tmp_file, output_file)
+    finally:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+
+
+def write_json_stream(
+    output_file: str, header: Dict[str, Any], sections: Dict[str, Iterable[Any]]
+) -> None:
+    """Write a JSON object whose list-valued fields are produced lazily.
+
+    The header fields are written first, followed by one array per entry in
+    sections. Array items are encoded and written as the iterables yield them,
+    so only one item is held in memory at a time. The file is identical to
+    write_json({**header, **{k: list(v) for k, v in sections.items()}}), with
+    either encoder, as long as the data holds no NaN or inf. output_file is only replaced once every item has been written.
+    """
+    tmp_file = output_file + ".tmp"
+    try:
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            f.write("{")
+            separator = "\n"
+            for key, value in header.items():
+                f.write(f"{separator}  {_dumps(key)}: {_dumps(value, 1)}")
+                separator = ",\n"
+            for key, items in sections.items():
+                f.write(f"{separator}  {_dumps(key)}: [")
+                item_separator = "\n"
+                for item in items:
+                    f.write(f"{item_separator}    {_dumps(item, 2)}")
+                    item_separator = ",\n"
+                f.write("]" if item_separator == "\n" else "\n  ]")
+                separator = ",\n"
+            f.write("}" if separator == "\n" else "\n}")
+        os.replace(tmp_file, output_file)
+    finally:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
@@ -284,23 +284,28 @@ public class SpeedBenchmark {
                 continue;
             }
             
-            JsonArray transforms = tc.getAsJsonArray("transformations");
+            // Transformations are stored column-wise: one array per field
+            JsonObject transforms = tc.getAsJsonObject("transformations");
+            JsonObject inputs = transforms.getAsJsonObject("inputs");
+            JsonObject outputs = transforms.getAsJsonObject("outputs");
+            JsonArray inputsX = inputs.getAsJsonArray("x");
+            JsonArray inputsY = inputs.getAsJsonArray("y");
+            JsonArray outputsX = outputs.getAsJsonArray("x");
+            JsonArray outputsY = outputs.getAsJsonArray("y");
+            JsonArray errors = transforms.getAsJsonArray("errors");
             boolean isProjected = isProjectedCrs(toCrs);
             ErrorStats stats = isProjected ? projectedErrors : geographicErrors;
             
-            for (JsonElement tElem : transforms) {
-                JsonObject t = tElem.getAsJsonObject();
-                JsonObject input = t.getAsJsonObject("input");
-                JsonObject expected = t.getAsJsonObject("output");
-                
-                if (expected == null || t.get("error") != null && !t.get("error").isJsonNull()) {
+            for (int i = 0; i < inputsX.size(); i++) {
+                if (outputsX.get(i).isJsonNull() || outputsY.get(i).isJsonNull()
+                        || !errors.get(i).isJsonNull()) {
                     continue;
                 }
                 
-                double inX = input.get("x").getAsDouble();
-                double inY = input.get("y").getAsDouble();
-                double expX = expected.get("x").getAsDouble();
-                double expY = expected.get("y").getAsDouble();
+                double inX = inputsX.get(i).getAsDouble();
+                double inY = inputsY.get(i).getAsDouble();
+                double expX = outputsX.get(i).getAsDouble();
+                double expY = outputsY.get(i).getAsDouble();
                 
                 try {
                     Point result = Proj4.proj4(fromCrs, toCrs, new Point(inX, inY));
@@ -359,22 +364,28 @@ public class SpeedBenchmark {
             
             String fromCrs = transformResult.get("from_crs").getAsString();
             String toCrs = transformResult.get("to_crs").getAsString();
-            JsonArray transforms = transformResult.getAsJsonArray("transformations");
+            // Transformations are stored column-wise: one array per field
+            JsonObject transforms = transformResult.getAsJsonObject("transformations");
             if (transforms == null) continue;
             
-            for (JsonElement tElem : transforms) {
-                JsonObject t = tElem.getAsJsonObject();
-                JsonObject input = t.getAsJsonObject("input");
-                JsonObject expected = t.getAsJsonObject("output");
-                
-                if (expected == null || (t.has("error") && !t.get("error").isJsonNull())) {
+            JsonObject inputs = transforms.getAsJsonObject("inputs");
+            JsonObject outputs = transforms.getAsJsonObject("outputs");
+            JsonArray inputsX = inputs.getAsJsonArray("x");
+            JsonArray inputsY = inputs.getAsJsonArray("y");
+            JsonArray outputsX = outputs.getAsJsonArray("x");
+            JsonArray outputsY = outputs.getAsJsonArray("y");
+            JsonArray errors = transforms.getAsJsonArray("errors");
+            
+            for (int i = 0; i < inputsX.size(); i++) {
+                if (outputsX.get(i).isJsonNull() || outputsY.get(i).isJsonNull()
+                        || !errors.get(i).isJsonNull()) {
                     continue;
                 }
                 
-                double inX = input.get("x").getAsDouble();
-                double inY = input.get("y").getAsDouble();
-                double expX = expected.get("x").getAsDouble();
-                double expY = expected.get("y").getAsDouble();
+                double inX = inputsX.get(i).getAsDouble();
+                double inY = inputsY.get(i).getAsDouble();
+                double expX = outputsX.get(i).getAsDouble();
+                double expY = outputsY.get(i).getAsDouble();
                 
                 try {
                     Point result = Proj4.proj4(fromCrs, toCrs, new Point(inX, inY));